@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of cmcdict loading, lookups and IP conversions.
+
+Measures the import time, the cold (XML) and snapshot loads of the dictionary,
+single and batch metadata lookups over the nomvar corpora of the test suite,
+IP-qualified lookups and scalar versus vectorized IP conversions.
+
+Results are written as JSON so that runs can be compared, for example before and
+after upgrading Polars:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --compare before.json
+
+With --compare, benchmarks slower than the reference by more than the threshold
+are reported and the script exits with a non-zero status.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TEST_DIR = ROOT_DIR / "test"
+
+sys.path.insert(0, str(ROOT_DIR))
+
+import numpy as np  # noqa: E402
+import polars as pl  # noqa: E402
+
+import cmcdict  # noqa: E402
+
+CORPORA = {
+    "current_vars": TEST_DIR / "current_vars.txt",
+    "special_vars": TEST_DIR / "special_vars.txt",
+}
+
+
+def read_corpus(path: Path) -> List[str]:
+    """Read a file of nomvars, one per line, skipping blank lines."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def measure(repeat: int, func: Callable[..., Any], *args: Any) -> Dict[str, float]:
+    """Time repeat calls of func(*args) and summarize them in seconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+    return {"median": statistics.median(samples), "min": min(samples), "max": max(samples), "repeat": repeat}
+
+
+def run_python(code: str, env: Optional[Dict[str, str]] = None) -> Any:
+    """Run code in a fresh interpreter and return the JSON value it prints."""
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(ROOT_DIR),
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_subprocess(code: str, repeat: int, env: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Summarize the durations printed by code run in repeat fresh interpreters."""
+    samples = [run_python(code, env) for _ in range(repeat)]
+    durations = [sample["duration"] for sample in samples]
+    return {
+        "median": statistics.median(durations),
+        "min": min(durations),
+        "max": max(durations),
+        "repeat": repeat,
+        "load_phases": samples[-1].get("load"),
+    }
+
+
+IMPORT_CODE = """
+import json, time
+start = time.perf_counter()
+import cmcdict
+print(json.dumps({"duration": time.perf_counter() - start}))
+"""
+
+LOAD_CODE = """
+import json, time
+import cmcdict
+start = time.perf_counter()
+cmcdict.preload()
+print(json.dumps({"duration": time.perf_counter() - start, "load": cmcdict.stats()["load"]}))
+"""
+
+
+def bench_import(repeat: int) -> Dict[str, Dict[str, Any]]:
+    return {"import": measure_subprocess(IMPORT_CODE, repeat)}
+
+
+def bench_load(repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {"load_cold": measure_subprocess(LOAD_CODE, repeat, {"CMCDICT_DISABLE_SNAPSHOT": "1"})}
+    with tempfile.TemporaryDirectory(prefix="cmcdict-bench-") as cache_dir:
+        env = {"CMCDICT_CACHE_DIR": cache_dir}
+        # Write the snapshot first
+        run_python(LOAD_CODE, env)
+        results["load_snapshot"] = measure_subprocess(LOAD_CODE, repeat, env)
+    return results
+
+
+def single_lookups(nomvars: List[str]) -> None:
+    for nomvar in nomvars:
+        cmcdict.get_metvar_metadata(nomvar)
+
+
+def ip_lookups(keys: List[Tuple[str, str]], ip: str) -> None:
+    for nomvar, value in keys:
+        cmcdict.get_metvar_metadata(nomvar, **{ip: value})
+
+
+def scalar_conversions(values: List[Union[int, float]], kind: int, mode: int) -> None:
+    for value in values:
+        if mode < 0:
+            cmcdict.convert_ip(value, 0, kind, mode)
+        else:
+            cmcdict.convert_ip(0, value, kind, mode)
+
+
+def bench_lookups(repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    cmcdict.preload()
+    for name, path in CORPORA.items():
+        nomvars = read_corpus(path)
+
+        cmcdict.set_cache_size(0)
+        results[f"{name}_single_uncached"] = {**measure(repeat, single_lookups, nomvars), "items": len(nomvars)}
+        results[f"{name}_batch"] = {**measure(repeat, cmcdict.get_metvar_metadata, nomvars), "items": len(nomvars)}
+
+        # Large enough for the whole corpus
+        cmcdict.set_cache_size(None)
+        single_lookups(nomvars)
+        results[f"{name}_single_cached"] = {**measure(repeat, single_lookups, nomvars), "items": len(nomvars)}
+        cmcdict.set_cache_size()
+
+        results[f"{name}_frame"] = {
+            **measure(repeat, cmcdict.get_metvar_metadata_frame, nomvars),
+            "items": len(nomvars),
+        }
+        records = pl.Series("nomvar", nomvars * 1000)
+        results[f"{name}_frame_repeated"] = {
+            **measure(repeat, cmcdict.get_metvar_metadata_frame, records),
+            "items": len(records),
+        }
+    return results
+
+
+def bench_ip_lookups(repeat: int) -> Dict[str, Dict[str, Any]]:
+    """Lookups of the variables defined per IP1 or IP3 value, with their IP values."""
+    results = {}
+    metvar_df = cmcdict._get_dictionary()._metvar_df
+    for ip in ("ip1", "ip3"):
+        keys = (
+            metvar_df.filter(pl.col(ip).is_not_null() & (pl.col(ip) != "") & (pl.col("usage") == "current"))
+            .select("nomvar", ip)
+            .rows()
+        )
+
+        cmcdict.set_cache_size(0)
+        results[f"{ip}_single_uncached"] = {**measure(repeat, ip_lookups, keys, ip), "items": len(keys)}
+        cmcdict.set_cache_size()
+
+        records = pl.DataFrame(keys * 1000, schema=["nomvar", ip], orient="row")
+        results[f"{ip}_frame"] = {
+            **measure(repeat, cmcdict.get_metvar_metadata_frame, records),
+            "items": records.height,
+        }
+    return results
+
+
+def bench_convert_ip(repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    rng = np.random.default_rng(0)
+    ips = {
+        "old_style": rng.integers(0, 32768, 100_000),
+        "new_style": np.array(
+            [cmcdict.convert_ip(0, p, int(cmcdict.Kind.PRESSURE), 1)[0] for p in rng.uniform(1, 1000, 1000).tolist()]
+            * 100
+        ),
+    }
+    for name, values in ips.items():
+        results[f"decode_{name}_scalar"] = {
+            **measure(repeat, scalar_conversions, values.tolist(), 0, -1),
+            "items": len(values),
+        }
+        results[f"decode_{name}_vectorized"] = {
+            **measure(repeat, cmcdict.convert_ip_array, values, 0, 0, -1),
+            "items": len(values),
+        }
+
+    pressure = int(cmcdict.Kind.PRESSURE)
+    levels = rng.uniform(1, 1000, 100_000)
+    results["encode_pressure_scalar"] = {
+        **measure(repeat, scalar_conversions, levels.tolist(), pressure, 1),
+        "items": len(levels),
+    }
+    results["encode_pressure_vectorized"] = {
+        **measure(repeat, cmcdict.convert_ip_array, 0, levels, pressure, 1),
+        "items": len(levels),
+    }
+    return results
+
+
+BENCHMARKS = {
+    "import": bench_import,
+    "load": bench_load,
+    "lookups": bench_lookups,
+    "ip_lookups": bench_ip_lookups,
+    "convert_ip": bench_convert_ip,
+}
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "cmcdict": cmcdict.__version__,
+        "python": platform.python_version(),
+        "polars": pl.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: Dict[str, Any], reference: Dict[str, Any], threshold: float) -> List[str]:
+    """List the benchmarks slower than in reference by more than threshold."""
+    regressions = []
+    for group, benchmarks in results["benchmarks"].items():
+        for name, result in benchmarks.items():
+            previous = reference.get("benchmarks", {}).get(group, {}).get(name)
+            if previous and result["median"] > previous["median"] * threshold:
+                ratio = result["median"] / previous["median"]
+                regressions.append(f"{group}.{name}: {ratio:.2f}x slower")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--repeat", type=int, default=5, help="number of samples per benchmark (default: 5)")
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), help="run only these benchmark groups")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare to")
+    parser.add_argument(
+        "--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression (default: 1.25)"
+    )
+    args = parser.parse_args(argv)
+
+    results = {"environment": environment(), "benchmarks": {}}
+    for group in args.only or BENCHMARKS:
+        print(f"Running {group} benchmarks", file=sys.stderr)
+        results["benchmarks"][group] = BENCHMARKS[group](args.repeat)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"Regression {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
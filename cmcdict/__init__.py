@@ -19,28 +19,28 @@
 
 __version__ = "2025.03.00"
 
-import importlib.resources
 import logging
 import os
 import sys
-import xml.etree.ElementTree as etree
+import threading
+from datetime import date, datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
-
-import numpy as np
-import polars as pl
-
-from .config import (
-    COUNTDOWN_RANGE,
-    FACTOR_VALUES,
-    HIGH_VALUES,
-    LOW_VALUES,
-    NEW_STYLE_RANGES,
-    OLD_STYLE_RANGES,
-    ZERO_VALUES,
-    Kind,
-)
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from . import metrics
+from .codes import CodeTable, decode_codes, get_code_table  # noqa: F401
+from .config import Kind  # noqa: F401
+from .ip import convert_ip, convert_ip_array  # noqa: F401
+from .search import SearchResult, search  # noqa: F401
+from .stream import annotate_stream  # noqa: F401
+from .validation import RangeCheck, validate_ranges, validate_ranges_batch  # noqa: F401
+
+if TYPE_CHECKING:
+    import numpy as np
+    import polars as pl
+
+    from .dictionary import CMCDictionary
 
 LOGGER = logging.getLogger(__name__)
 
@@ -55,8 +55,6 @@ class MultipleDefinitionsException(Exception):
     pass
 
 
-__VAR_DICT_FILE = "ops.variable_dictionary.xml"
-
 __METVAR_METADATA_COLUMNS = [
     "usage",
     "origin",
@@ -74,728 +72,539 @@ __METVAR_METADATA_COLUMNS = [
     "magnitude",
 ]
 
-__METVAR_USAGES = ["current"]
+__METVAR_USAGES = ["current", "obsolete", "deprecated", "incomplete", "future"]
 
 __TYPVAR_METADATA_COLUMNS = ["date", "description_short_en", "description_short_fr"]
 
+# Names of the lookup engine (cmcdict.dictionary), imported on first access
+_ENGINE_NAMES = {
+    "CMCDictionary",
+    "METVAR_SCHEMA",
+    "TYPVAR_SCHEMA",
+    "process_metvar",
+    "process_typvar",
+    "_decode_ip_value",
+    "_find_ops_variable_dictionary",
+    "_parse_opt_dict",
+}
 
-@lru_cache(maxsize=0 if "pytest" in sys.modules else 256)
-def _find_ops_variable_dictionary() -> Optional[Path]:
-    """Find the operational dictionary XML file.
+# The lookup engine module once imported, see _engine
+_engine_module = None
 
-    This function searches for the dictionary file in the following locations:
-    1. CMCCONST environment variable path
-    2. Default system path (/home/smco502/datafiles/constants)
-    3. Package's data directory
 
-    Returns:
-        Optional[Path]: Path to the XML dictionary file if found, None otherwise.
+def _engine():
+    """Import the lookup engine on first use.
 
-    Raises:
-        OpDictNotFoundException: If the dictionary file is not found in any location.
+    The engine imports Polars, it is only imported by the first lookup so that callers
+    that only need :func:`convert_ip` or :class:`Kind` do not pay that cost.
+
+    Returns:
+        module: The cmcdict.dictionary module.
     """
-    try:
-        # Check if CMCCONST is defined
-        if "CMCCONST" in os.environ:
-            base_path = Path(os.environ["CMCCONST"])
-            dict_file = base_path / "opdict" / __VAR_DICT_FILE
-            if dict_file.exists():
-                LOGGER.info(f"Found dictionary file at {dict_file}")
-                return dict_file
-
-        # Try default system path
-        base_path = Path("/home/smco502/datafiles/constants/optdict")
-        dict_file = base_path / __VAR_DICT_FILE
-        if dict_file.exists():
-            LOGGER.info(f"Found dictionary file at {dict_file}")
-            return dict_file
-
-        # Try package's directory as fallback
-        package_data_path = Path(__file__).parent / "dict.xml"
-
-        if package_data_path.exists():
-            LOGGER.info(f"Found dictionary file in package data at {package_data_path}")
-            return package_data_path
-
-        raise OpDictNotFoundException("Dictionary file not found in any location")
-
-    except Exception as e:
-        if isinstance(e, OpDictNotFoundException):
-            raise
-        LOGGER.error(f"Error finding operational dictionary: {str(e)}")
-        return None
+    global _engine_module
+    if _engine_module is None:
+        from . import dictionary
+
+        _engine_module = dictionary
+    return _engine_module
 
 
-# @lru_cache(maxsize=None)
-@lru_cache(maxsize=0 if "pytest" in sys.modules else 256)
-def _parse_opt_dict() -> Optional[etree.Element]:
-    """Parse the operational dictionary XML file.
+def __getattr__(name: str) -> Any:
+    if name in _ENGINE_NAMES:
+        return getattr(_engine(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _get_dictionary() -> "CMCDictionary":
+    """Return the cached dictionary, loading it on first use.
+
+    The operational dictionary is not parsed at import time so that callers that
+    only need :func:`convert_ip` or :class:`Kind` do not pay the loading cost.
 
     Returns:
-        Optional[etree.Element]: Root element of the parsed XML tree if successful, None otherwise.
+        CMCDictionary: The singleton dictionary instance.
+    """
+    return (_engine_module or _engine()).CMCDictionary()
 
-    Note:
-        This function is cached using lru_cache for performance optimization.
-        Cache is disabled during pytest execution.
+
+def _is_ndarray(value: Any) -> bool:
+    """Check if value is a NumPy array without importing NumPy.
+
+    A value can only be an array if NumPy was already imported by the caller.
     """
-    try:
-        # Find the dictionary file
-        dict_file = _find_ops_variable_dictionary()
-        if dict_file is None:
-            LOGGER.warning("Could not find operational dictionary file")
-            return None
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
 
-        # Parse the XML file
-        tree = etree.parse(dict_file)
-        root = tree.getroot()
 
-        # Check if we found any metvar elements
-        metvars = root.findall(".//metvar")
-        if not metvars:
-            LOGGER.warning("No metvar elements found in dictionary")
-            return None
+def preload() -> None:
+    """Load the operational dictionary ahead of the first lookup.
 
-        LOGGER.warning(f"Found {len(metvars)} metvar elements")
-        return root
+    The dictionary is loaded lazily on the first call to :func:`get_metvar_metadata`
+    or :func:`get_typvar_metadata`. Long running services can call this function at
+    startup to move that cost out of the first request.
+    """
+    _get_dictionary()
 
-    except Exception as e:
-        LOGGER.warning(f"Error parsing operational dictionary: {str(e)}")
-        return None
 
+def export_shared(directory: Optional[Union[str, Path]] = None) -> Path:
+    """Share the loaded dictionary with worker processes.
 
-def process_metvar(metvar_element: etree.Element) -> Dict[str, Any]:
-    """Process a metvar element from the XML dictionary according to DTD structure.
+    The dictionary DataFrames are exported to uncompressed Arrow IPC files, and the
+    CMCDICT_SHARED_DICTIONARY environment variable is set to their location. Worker
+    processes started afterwards (multiprocessing, ProcessPoolExecutor) inherit the
+    variable and memory-map the files on their first lookup instead of parsing the
+    operational dictionary, so all the workers share a single copy of the data.
 
     Args:
-        metvar_element (etree.Element): The metvar XML element to process.
+        directory (Optional[Union[str, Path]]): Directory where the files are written.
+            Defaults to a new temporary directory (in /dev/shm when available) that is
+            removed when the current process exits.
 
     Returns:
-        Dict[str, Any]: Dictionary containing the processed metvar metadata with the following keys:
-            - origin: Origin of the variable
-            - usage: Usage state (default: "current")
-            - pack: Packing information
-            - date: Date of definition
-            - nomvar: Variable name
-            - ip1, ip2, ip3: IP values
-            - level: Level information
-            - kind: Kind of variable
-            - etiket: Etiket value
-            - description_short_en/fr: Short descriptions in English/French
-            - description_long_en/fr: Long descriptions in English/French
-            - measure_type: Type of measurement
-            - units: Units of measurement
-            - precision: Precision for real values
-            - magnitude: Magnitude information
-            - min/max: Range limits
-            - codes: Code definitions for code/logical types
+        Path: The directory holding the exported files, see :func:`attach_shared`.
     """
-    record = {}
-
-    # Get metvar attributes
-    record["origin"] = metvar_element.get("origin", "")
-    record["usage"] = metvar_element.get("usage", "current")
-    record["pack"] = metvar_element.get("pack", "")
-    record["date"] = metvar_element.get("date", "")
-
-    # Get nomvar element and its attributes
-    nomvar_elem = metvar_element.find("nomvar")
-    if nomvar_elem is not None:
-        record["nomvar"] = nomvar_elem.text.strip() if nomvar_elem.text else ""
-        # Get all nomvar attributes
-        record["ip1"] = nomvar_elem.get("ip1", "")
-        record["ip2"] = nomvar_elem.get("ip2", "")
-        record["ip3"] = nomvar_elem.get("ip3", "")
-        record["level"] = nomvar_elem.get("level", "")
-        record["kind"] = nomvar_elem.get("kind", "")
-        record["etiket"] = nomvar_elem.get("etiket", "")
-    else:
-        record["nomvar"] = ""
-        record["ip1"] = record["ip2"] = record["ip3"] = ""
-        record["level"] = record["kind"] = record["etiket"] = ""
-
-    # Get description elements
-    desc_elem = metvar_element.find("description")
-    if desc_elem is not None:
-        # Get short descriptions
-        short_en = desc_elem.find("short[@lang='en']")
-        short_fr = desc_elem.find("short[@lang='fr']")
-        record["description_short_en"] = short_en.text.strip() if short_en is not None and short_en.text else ""
-        record["description_short_fr"] = short_fr.text.strip() if short_fr is not None and short_fr.text else ""
-
-        # Get long descriptions
-        long_en = desc_elem.find("long[@lang='en']")
-        long_fr = desc_elem.find("long[@lang='fr']")
-        record["description_long_en"] = long_en.text.strip() if long_en is not None and long_en.text else ""
-        record["description_long_fr"] = long_fr.text.strip() if long_fr is not None and long_fr.text else ""
-    else:
-        record["description_short_en"] = record["description_short_fr"] = ""
-        record["description_long_en"] = record["description_long_fr"] = ""
-
-    # Process measure element
-    measure_elem = metvar_element.find("measure")
-    if measure_elem is not None:
-        # Find which type of measure it is
-        measure_type = None
-        measure_data = None
-        for type_name in ["integer", "real", "logical", "code"]:
-            type_elem = measure_elem.find(type_name)
-            if type_elem is not None:
-                measure_type = type_name
-                measure_data = type_elem
-                break
-
-        record["measure_type"] = measure_type if measure_type else ""
-
-        if measure_data is not None:
-            # Handle common elements for integer and real
-            if measure_type in ["integer", "real"]:
-                units_elem = measure_data.find("units")
-                record["units"] = units_elem.text.strip() if units_elem is not None and units_elem.text else ""
-
-                magnitude_elem = measure_data.find("magnitude")
-                record["magnitude"] = (
-                    magnitude_elem.text.strip() if magnitude_elem is not None and magnitude_elem.text else ""
-                )
-
-                min_elem = measure_data.find("min")
-                record["min"] = min_elem.text.strip() if min_elem is not None and min_elem.text else ""
-
-                max_elem = measure_data.find("max")
-                record["max"] = max_elem.text.strip() if max_elem is not None and max_elem.text else ""
-
-                # Additional elements for real type
-                if measure_type == "real":
-                    precision_elem = measure_data.find("precision")
-                    record["precision"] = (
-                        precision_elem.text.strip() if precision_elem is not None and precision_elem.text else ""
-                    )
-                else:
-                    record["precision"] = ""
-
-            # Handle code and logical types
-            elif measure_type in ["code", "logical"]:
-                codes = []
-                values = measure_data.findall("value")
-                meanings_en = measure_data.findall("meaning[@lang='en']")
-                # meanings_fr = measure_data.findall("meaning[@lang='fr']")
-                meanings = measure_data.findall("meaning")
-
-                # If we have language-specific meanings
-                if meanings_en and len(values) == len(meanings_en):
-                    for val, meaning in zip(values, meanings_en):
-                        if val.text and meaning.text:
-                            codes.append(f"{val.text.strip()}:{meaning.text.strip()}")
-                # If we have both languages without explicit attributes
-                elif len(values) * 2 == len(measure_data.findall("meaning")):
-                    meanings = measure_data.findall("meaning")
-                    half = len(meanings) // 2
-                    for i, val in enumerate(values):
-                        if val.text and meanings[i].text and meanings[i + half].text:
-                            codes.append(
-                                f"{val.text.strip()}:{meanings[i].text.strip()}/{meanings[i + half].text.strip()}"
-                            )
-                # Simple value-meaning pairs without language attributes
-                elif len(values) == len(meanings):
-                    for val, meaning in zip(values, meanings):
-                        if val.text and meaning.text:
-                            codes.append(f"{val.text.strip()}:{meaning.text.strip()}")
-
-                record["codes"] = ";".join(codes) if codes else None
-                record["units"] = record["precision"] = record["magnitude"] = ""
-                record["min"] = record["max"] = ""
-    else:
-        record["measure_type"] = ""
-        record["units"] = record["precision"] = record["magnitude"] = ""
-        record["min"] = record["max"] = ""
-        record["codes"] = None
+    from .snapshot import SHARED_DICTIONARY_ENV, export_frames
+
+    dictionary = _get_dictionary()
+    if directory is None:
+        import atexit
+        import shutil
+        import tempfile
 
-    return record
+        directory = tempfile.mkdtemp(prefix="cmcdict-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
 
+    path = export_frames(Path(directory), dictionary._metvar_df, dictionary._typvar_df, dictionary._source)
+    os.environ[SHARED_DICTIONARY_ENV] = str(path)
+    return path
 
-def process_typvar(typvar_element: etree.Element) -> Dict[str, str]:
-    """Process a typvar element from the XML dictionary according to DTD structure.
+
+def attach_shared(directory: Union[str, Path]) -> None:
+    """Attach a worker process to a dictionary exported by :func:`export_shared`.
+
+    Workers inherit the location from the environment of their parent, this function
+    is for workers that do not, for example as a pool initializer. It does nothing if
+    the dictionary is already loaded in the current process.
 
     Args:
-        typvar_element (etree.Element): The typvar XML element to process.
+        directory (Union[str, Path]): Directory returned by :func:`export_shared`.
+    """
+    from .snapshot import SHARED_DICTIONARY_ENV
+
+    if _engine().CMCDictionary._instance is None:
+        os.environ[SHARED_DICTIONARY_ENV] = str(directory)
+        _get_dictionary()
+
+
+class FrozenDict(dict):
+    """Read-only dictionary returned by the metadata lookups.
+
+    Lookup results are cached and shared by all the callers, they cannot be modified.
+    Use ``dict(result)`` or ``result.copy()`` to get a modifiable copy.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("metadata results are read-only, use dict(result) to get a copy")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def _freeze(result: Any) -> Any:
+    """Convert a lookup result and its nested dictionaries to FrozenDict."""
+    if isinstance(result, dict):
+        return FrozenDict((key, _freeze(value)) for key, value in result.items())
+    return result
+
+
+_reload_lock = threading.Lock()
+_reload_callbacks: List[Callable[[int], None]] = []
+_reload_watcher = None
+
+
+def generation() -> int:
+    """Get the generation of the loaded dictionary.
+
+    The generation starts at 0 and is incremented every time :func:`reload` swaps
+    in a new dictionary, callers can compare it to know whether derived data is stale.
 
     Returns:
-        Dict[str, str]: Dictionary containing the processed typvar metadata with the following keys:
-            - origin: Origin of the type
-            - usage: Usage state (default: "current")
-            - date: Date of definition
-            - typvar: Type name
-            - description_short_en/fr: Short descriptions in English/French
+        int: The generation of the loaded dictionary.
     """
-    record = {}
-
-    # Get typvar attributes
-    record["origin"] = typvar_element.get("origin", "")
-    record["usage"] = typvar_element.get("usage", "current")
-    record["date"] = typvar_element.get("date", "")
-
-    # Get nomtype element
-    nomtype_elem = typvar_element.find("nomtype")
-    record["typvar"] = nomtype_elem.text.strip() if nomtype_elem is not None and nomtype_elem.text else ""
-
-    # Get description elements
-    desc_elem = typvar_element.find("description")
-    if desc_elem is not None:
-        # Get short descriptions
-        short_en = desc_elem.find("short[@lang='en']")
-        short_fr = desc_elem.find("short[@lang='fr']")
-        record["description_short_en"] = short_en.text.strip() if short_en is not None and short_en.text else ""
-        record["description_short_fr"] = short_fr.text.strip() if short_fr is not None and short_fr.text else ""
-    else:
-        record["description_short_en"] = record["description_short_fr"] = ""
-
-    return record
-
-
-# Define schemas for the DataFrames
-METVAR_SCHEMA = {
-    "nomvar": pl.Utf8,
-    "origin": pl.Utf8,
-    "usage": pl.Utf8,
-    "pack": pl.Utf8,
-    "date": pl.Utf8,
-    "ip1": pl.Utf8,
-    "ip2": pl.Utf8,
-    "ip3": pl.Utf8,
-    "level": pl.Utf8,
-    "kind": pl.Utf8,
-    "etiket": pl.Utf8,
-    "description_short_en": pl.Utf8,
-    "description_short_fr": pl.Utf8,
-    "description_long_en": pl.Utf8,
-    "description_long_fr": pl.Utf8,
-    "measure_type": pl.Utf8,
-    "units": pl.Utf8,
-    "precision": pl.Utf8,
-    "magnitude": pl.Utf8,
-    "min": pl.Utf8,
-    "max": pl.Utf8,
-    "codes": pl.Utf8,
-}
+    return _get_dictionary().generation
 
-TYPVAR_SCHEMA = {
-    "typvar": pl.Utf8,
-    "origin": pl.Utf8,
-    "usage": pl.Utf8,
-    "date": pl.Utf8,
-    "description_short_en": pl.Utf8,
-    "description_short_fr": pl.Utf8,
-}
 
+def add_reload_callback(callback: Callable[[int], None]) -> None:
+    """Register a function called with the new generation after each reload.
+
+    Callbacks are called from the thread that reloaded the dictionary, exceptions
+    they raise are logged and ignored.
+
+    Args:
+        callback (Callable[[int], None]): The function to call.
+    """
+    with _reload_lock:
+        _reload_callbacks.append(callback)
 
-class CMCDictionary:
-    """Singleton class that caches the XML as Polars DataFrames for faster lookups.
 
-    This class implements the Singleton pattern to ensure only one instance exists
-    that caches the operational dictionary data in memory for efficient lookups.
+def remove_reload_callback(callback: Callable[[int], None]) -> None:
+    """Unregister a function registered with :func:`add_reload_callback`.
 
-    Attributes:
-        _metvar_df (pl.DataFrame): DataFrame containing metvar metadata
-        _typvar_df (pl.DataFrame): DataFrame containing typvar metadata
+    Args:
+        callback (Callable[[int], None]): The function to remove.
     """
+    with _reload_lock:
+        if callback in _reload_callbacks:
+            _reload_callbacks.remove(callback)
 
-    _instance = None
-    _initialized = False
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
-
-    def __init__(self):
-        if not self._initialized:
-            self._load_dictionary()
-            self._initialized = True
-
-    def _load_dictionary(self):
-        """Load and parse the XML dictionary once into Polars DataFrames"""
-        root = globals()["_parse_opt_dict"]()
-        if root is None:
-            LOGGER.error("Failed to get XML root element")
-            raise Exception("Failed to get XML root element")
-
-        # Process metvars
-        metvar_records = []
-        for metvar in root.findall(".//metvar"):
-            record = process_metvar(metvar)
-            if record["nomvar"]:  # Only add if nomvar exists
-                metvar_records.append(record)
-
-        # Create metvar DataFrame
-        if metvar_records:
-            self._metvar_df = pl.DataFrame(metvar_records, schema=METVAR_SCHEMA).sort("nomvar")
-        else:
-            self._metvar_df = None
-            LOGGER.error("No metvar records found")
-
-        # Process typvars
-        typvar_records = []
-        for typvar in root.findall(".//typvar"):
-            record = process_typvar(typvar)
-            if record["typvar"]:  # Only add if typvar exists
-                typvar_records.append(record)
-
-        # Create typvar DataFrame
-        if typvar_records:
-            self._typvar_df = pl.DataFrame(typvar_records, schema=TYPVAR_SCHEMA).sort("typvar")
-        else:
-            self._typvar_df = None
-            LOGGER.error("No typvar records found")
-
-    def get_metvar(
-        self,
-        nomvar: Union[str, Sequence[str]],
-        columns: List[str],
-        usages: List[str] = None,
-        ip1: Optional[Union[str, int, Sequence[Union[str, int]]]] = None,
-        ip3: Optional[Union[str, int, Sequence[Union[str, int]]]] = None,
-    ) -> Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
-        """Get metadata for one or more metvars using cache.
-
-        Args:
-            nomvar: Single nomvar string or sequence of nomvars
-            columns: List of columns to return
-            usages: List of usages to consider (default: ["current"])
-            ip1: Optional single value or sequence of ip1 values
-            ip3: Optional single value or sequence of ip3 values
-
-        Returns:
-            For single nomvar without IP: Dictionary mapping column names to values
-            For single nomvar with IP: Dictionary mapping IP values to metadata dictionaries
-            For sequence input: Dictionary mapping nomvars to metadata dictionaries
-            Returns None if not found
-        """
-        if usages is None:
-            usages = ["current"]
-
-        if self._metvar_df is None:
-            return None
 
-        # Convert inputs to lists if they're sequences
-        is_sequence = not isinstance(nomvar, str)
-        nomvars = list(nomvar) if is_sequence else [nomvar]
+def reload(force: bool = False) -> bool:
+    """Reload the operational dictionary if its file changed.
 
-        # Convert IP values if provided
-        def convert_ip_value(x):
-            if x is None or (isinstance(x, str) and not x.strip()):
-                return None
-            try:
-                val = float(x)
-                if val.is_integer():
-                    val = int(val)
-                    # Get just the p value from convert_ip
-                    _, p, _ = convert_ip(val, 0, 0, -1)  # Decode mode
-                    return p
-                return val
-            except (ValueError, TypeError):
-                return None
-
-        # Handle IP1 values
-        if ip1 is not None:
-            if is_sequence and not isinstance(ip1, (str, int)):
-                if len(ip1) != len(nomvars):
-                    raise ValueError("All input sequences must have the same length")
-                ip1s = [convert_ip_value(x) for x in ip1]
-            else:
-                ip1s = [convert_ip_value(ip1)] * len(nomvars)
-        else:
-            ip1s = [None] * len(nomvars)
-
-        # Handle IP3 values
-        if ip3 is not None:
-            if is_sequence and not isinstance(ip3, (str, int)):
-                if len(ip3) != len(nomvars):
-                    raise ValueError("All input sequences must have the same length")
-                ip3s = [convert_ip_value(x) for x in ip3]
-            else:
-                ip3s = [convert_ip_value(ip3)] * len(nomvars)
-        else:
-            ip3s = [None] * len(nomvars)
-
-        # Process each nomvar
-        results = {}
-        for i, nv in enumerate(nomvars):
-            if not isinstance(nv, str):
-                results[nv] = None
-                continue
-            try:
-                # Build filter conditions
-                conditions = [pl.col("nomvar") == nv]
-
-                # Only apply usage filter if the variable has a usage attribute
-                if usages:
-                    conditions.append(
-                        pl.col("usage").is_in(usages) | pl.col("usage").is_null() | (pl.col("usage") == "")
-                    )
-
-                # Get initial result
-                result = self._metvar_df
-                for condition in conditions:
-                    result = result.filter(condition)
-                if result.height == 0:
-                    results[nv] = None
-                    continue
-                # Check if this metvar has IP values
-                has_ip1 = result.filter(pl.col("ip1").ne("")).height > 0
-                has_ip3 = result.filter(pl.col("ip3").ne("")).height > 0
-
-                # If the metvar has IP values, return a dictionary of IP definitions
-                if has_ip1 or has_ip3:
-                    ip_results = {}
-                    # Convert IP values in the DataFrame to p values
-                    if has_ip1:
-                        # Convert IP1 values to p values
-                        try:
-                            result = result.with_columns(
-                                [pl.col("ip1").map_elements(convert_ip_value, return_dtype=pl.Float32).alias("ip1_p")]
-                            )
-                        except AttributeError:
-                            result = result.with_columns([pl.col("ip1").apply(convert_ip_value).alias("ip1_p")])
-
-                    if has_ip3:
-                        try:
-                            result = result.with_columns(
-                                [pl.col("ip3").map_elements(convert_ip_value, return_dtype=pl.Float32).alias("ip3_p")]
-                            )
-                        except AttributeError:
-                            result = result.with_columns([pl.col("ip3").apply(convert_ip_value).alias("ip3_p")])
-
-                    # Apply IP filters if provided
-                    if ip1s[i] is not None and has_ip1:
-                        result = result.filter(pl.col("ip1_p") == ip1s[i])
-                    if ip3s[i] is not None and has_ip3:
-                        result = result.filter(pl.col("ip3_p") == ip3s[i])
-
-                    # If specific IP values were provided and found, return single result
-                    if (ip1s[i] is not None or ip3s[i] is not None) and len(result) > 0:
-                        result = result.sort("date", descending=True)
-                        row = result.row(0, named=True)
-                        results[nv] = {"nomvar": nv, **{col: row[col] for col in columns}}
-                    else:
-                        # Otherwise return all IP definitions
-                        result = result.sort("date", descending=True)
-                        for row in result.iter_rows(named=True):
-                            key = row["ip1"] if has_ip1 else row["ip3"]
-                            if key and key.strip():
-                                ip_results[key] = {"nomvar": nv, **{col: row[col] for col in columns}}
-                        results[nv] = ip_results if ip_results else None
-                else:
-                    # For non-IP variables, return the most recent definition
-                    if len(result) > 0:
-                        result = result.sort("date", descending=True)
-                        row = result.row(0, named=True)
-                        results[nv] = {"nomvar": nv, **{col: row[col] for col in columns}}
-                    else:
-                        results[nv] = None
+    The dictionary file is located again and its modification time and size are
+    compared to the loaded one. When they differ, a new dictionary is built while
+    lookups keep using the current one, then swapped in atomically.
+
+    Args:
+        force (bool): Reload even if the dictionary file did not change.
 
+    Returns:
+        bool: True if a new dictionary was swapped in, False otherwise. Nothing is
+            reloaded before the dictionary is first loaded.
+    """
+    engine = _engine_module
+    with _reload_lock:
+        current = engine.CMCDictionary._instance if engine is not None else None
+        if current is None:
+            return False
+
+        engine._find_ops_variable_dictionary.cache_clear()
+        if not force:
+            dict_file = engine._find_ops_variable_dictionary()
+            if dict_file is None or engine._source_signature(dict_file) == current._source:
+                return False
+
+        # A shared dictionary is as old as the loaded one, the new one is loaded from its file
+        instance = engine.CMCDictionary._build(current.generation + 1, shared=False)
+        with engine.CMCDictionary._lock:
+            engine.CMCDictionary._instance = instance
+        # Entries are keyed by dictionary instance, drop the ones of the previous dictionary
+        _metvar_cache.cache_clear()
+        LOGGER.info(f"Reloaded operational dictionary, generation {instance.generation}")
+
+        callbacks = list(_reload_callbacks)
+
+    for callback in callbacks:
+        try:
+            callback(instance.generation)
+        except Exception as e:
+            LOGGER.error(f"Error in dictionary reload callback: {str(e)}")
+    return True
+
+
+class _ReloadWatcher(threading.Thread):
+    """Daemon thread polling the dictionary file and reloading it when it changes"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="cmcdict-reload", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                reload()
             except Exception as e:
-                LOGGER.warning(f"Error getting metadata for {nv}: {str(e)}")
-                results[nv] = None
+                # Keep serving the current dictionary until the file can be loaded
+                LOGGER.warning(f"Error reloading operational dictionary: {str(e)}")
 
-        # Return results in appropriate format
-        if not is_sequence:
-            return results[nomvars[0]]
-        return results
 
-    def get_typvar(self, nomtype: str, columns: List[str]) -> Optional[Dict[str, str]]:
-        """Get metadata for a single typvar using cached DataFrame"""
-        if self._typvar_df is None or not isinstance(nomtype, str):
-            return None
+def enable_auto_reload(interval: float = 60.0) -> None:
+    """Poll the dictionary file in the background and reload it when it changes.
 
-        try:
-            # Get matching record
-            needed_cols = ["typvar"] + columns
-            result = self._typvar_df.filter(pl.col("typvar") == nomtype).select(needed_cols)
+    Long running services otherwise keep the dictionary loaded at startup until they
+    are restarted. Calling this function again changes the polling interval.
 
-            if len(result) == 0:
-                return None
+    Args:
+        interval (float): Seconds between two checks of the dictionary file.
 
-            row = result.row(0, named=True)
-            return {"typvar": nomtype, **{col: row[col] for col in columns}}
+    Raises:
+        ValueError: If interval is not positive
+    """
+    global _reload_watcher
+    if interval <= 0:
+        raise ValueError("interval must be positive")
 
-        except Exception as e:
-            LOGGER.warning(f"Error getting typvar metadata for {nomtype}: {str(e)}")
-            return None
+    disable_auto_reload()
+    _reload_watcher = _ReloadWatcher(interval)
+    _reload_watcher.start()
+
+
+def disable_auto_reload() -> None:
+    """Stop polling the dictionary file, see :func:`enable_auto_reload`."""
+    global _reload_watcher
+    watcher, _reload_watcher = _reload_watcher, None
+    if watcher is not None:
+        watcher.stopped.set()
+        if watcher is not threading.current_thread():
+            watcher.join()
+
+
+def _bind_convert_ip(function: Callable[[int, float, int, int], Tuple[int, float, int]]) -> None:
+    """Bind cmcdict.convert_ip and cmcdict.ip.convert_ip to function."""
+    global convert_ip
+    from . import ip
+
+    ip.convert_ip = convert_ip = function
+
+
+def enable_stats() -> None:
+    """Start counting and timing the calls to the public lookup functions, see :func:`stats`.
+
+    :func:`convert_ip` is only counted when called through the module, as ``cmcdict.convert_ip``,
+    so that it runs the original function without any check while the stats are disabled.
+    """
+    from .ip import _measured_convert_ip
+
+    metrics.ENABLED = True
+    _bind_convert_ip(_measured_convert_ip)
+
+
+def disable_stats() -> None:
+    """Stop counting and timing the calls to the public lookup functions."""
+    from .ip import _convert_ip
+
+    metrics.ENABLED = False
+    _bind_convert_ip(_convert_ip)
+
+
+def reset_stats() -> None:
+    """Reset the lookup counters and latency histograms, see :func:`stats`."""
+    metrics.reset()
+
+
+def stats() -> Dict[str, Any]:
+    """Get the loading and lookup statistics of cmcdict.
+
+    Lookup counters and latency histograms are only recorded after :func:`enable_stats`,
+    so that lookups cost nothing more when statistics are not needed.
+
+    Returns:
+        Dict[str, Any]: Dictionary with the following keys:
+            - enabled (bool): Whether lookup statistics are being recorded
+            - load (Dict[str, float]): Seconds spent in each phase of the last dictionary
+              load (discover, snapshot_load, parse, process, frame_build, snapshot_save,
+              index, total), only the phases that ran are present
+            - apis (Dict[str, Dict[str, Any]]): Per public function (get_metvar_metadata,
+              get_typvar_metadata, convert_ip), the number of calls, hits (calls that
+              returned a result), misses (calls that returned None), errors, the total
+              and mean time in seconds and a latency histogram mapping the upper bound
+              of each bucket in seconds to its number of calls
+            - cache (Dict[str, int]): Statistics of the result cache, see :func:`cache_info`
+            - memory (Dict[str, int]): Estimated size in bytes of the loaded DataFrames and
+              row cache, empty until the dictionary is loaded
+    """
+    memory = {}
+    dictionary = _engine_module.CMCDictionary._instance if _engine_module is not None else None
+    if dictionary is not None:
+        for name, df in (("metvar_df", dictionary._metvar_df), ("typvar_df", dictionary._typvar_df)):
+            if df is not None:
+                memory[name] = df.estimated_size()
+        rows = dictionary._metvar_rows
+        memory["metvar_rows"] = sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+
+    return {
+        "enabled": metrics.ENABLED,
+        "load": metrics.load_phases(),
+        "apis": metrics.api_stats(),
+        "cache": cache_info()._asdict(),
+        "memory": memory,
+    }
+
+
+def _check_metvar_columns(columns: Optional[List[str]]) -> List[str]:
+    """Validate the metvar columns argument, None selects all metadata columns."""
+    if columns is None:
+        return list(__METVAR_METADATA_COLUMNS)
+    elif not isinstance(columns, list):
+        raise ValueError("columns must be a list")
+    elif not columns:
+        raise ValueError("columns cannot be empty")
+    elif not all(isinstance(col, str) for col in columns):
+        raise TypeError("all columns must be strings")
+    elif not all(col in __METVAR_METADATA_COLUMNS for col in columns):
+        raise ValueError("invalid column name")
+    elif "nomvar" in columns:
+        raise ValueError("nomvar cannot be in columns")
+    return columns
+
+
+def _check_typvar_columns(columns: Optional[List[str]]) -> List[str]:
+    """Validate the typvar columns argument, None selects all metadata columns."""
+    if columns is None:
+        return list(__TYPVAR_METADATA_COLUMNS)
+    elif not isinstance(columns, list):
+        raise ValueError("columns must be a list")
+    elif not columns:
+        raise ValueError("columns cannot be empty")
+    elif not all(isinstance(col, str) for col in columns):
+        raise TypeError("all columns must be strings")
+    elif not all(col in __TYPVAR_METADATA_COLUMNS for col in columns):
+        raise ValueError("invalid column name")
+    elif "typvar" in columns:
+        raise ValueError("typvar cannot be in columns")
+    return columns
 
 
-# Create singleton instance
-_dict_cache = CMCDictionary()
+def _check_usages(usages: List[str]) -> None:
+    """Validate the usages argument."""
+    if not isinstance(usages, list):
+        raise ValueError("usages must be a list")
+    elif not usages:
+        raise ValueError("usages cannot be empty")
+    elif not all(isinstance(usage, str) for usage in usages):
+        raise TypeError("all usages must be strings")
+    elif not all(usage in __METVAR_USAGES for usage in usages):
+        invalid_usages = [usage for usage in usages if usage not in __METVAR_USAGES]
+        raise ValueError(f"Invalid usages: {', '.join(invalid_usages)}")
 
 
-def convert_ip(ip: int, p: float, kind: int, mode: int) -> Tuple[int, float, int]:
-    """Convert between IP values and real values with their associated kinds.
+def _check_as_of(as_of: Optional[Union[str, date]]) -> Optional[str]:
+    """Validate the as_of argument and normalize it to a YYYY-MM-DD string."""
+    if as_of is None:
+        return None
+    if isinstance(as_of, datetime):
+        return as_of.date().isoformat()
+    if isinstance(as_of, date):
+        return as_of.isoformat()
+    if not isinstance(as_of, str):
+        raise TypeError("as_of must be a date or a YYYY-MM-DD string")
+    try:
+        return date.fromisoformat(as_of.strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"Invalid as_of date: {as_of}, expected YYYY-MM-DD") from None
 
-    This function handles both encoding (P->IP) and decoding (IP->P) of values
-    using various coordinate systems (height, pressure, sigma, etc.).
+
+def _lookup_metvar(
+    dictionary: "CMCDictionary",
+    nomvar: Union[str, Sequence[str]],
+    columns: Optional[List[str]],
+    usages: Optional[List[str]],
+    ip1: Optional[Union[str, int, float, Sequence[Union[str, int, float]]]],
+    ip3: Optional[Union[str, int, float, Sequence[Union[str, int, float]]]],
+    as_of: Optional[str] = None,
+) -> Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Validate the arguments of get_metvar_metadata and look them up in dictionary, uncached."""
+    if usages is None:
+        usages = ["current"]
+
+    columns = _check_metvar_columns(columns)
+    _check_usages(usages)
+
+    return dictionary.get_metvar(nomvar, columns, usages, ip1, ip3, as_of)
+
+
+def _cached_lookup_metvar(
+    dictionary: "CMCDictionary",
+    nomvar: str,
+    columns: Optional[Tuple[str, ...]],
+    usages: Optional[Tuple[str, ...]],
+    ip1: Optional[Union[str, int, float, Tuple[Union[str, int, float], ...]]],
+    ip3: Optional[Union[str, int, float, Tuple[Union[str, int, float], ...]]],
+    as_of: Optional[str],
+) -> Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Look up a key built by _metvar_cache_key, validation only runs on cache misses."""
+    # Cached results are shared by all the callers
+    return _freeze(
+        _lookup_metvar(
+            dictionary,
+            nomvar,
+            None if columns is None else list(columns),
+            None if usages is None else list(usages),
+            ip1,
+            ip3,
+            as_of,
+        )
+    )
+
+
+DEFAULT_CACHE_SIZE = 1024
+
+_metvar_cache = lru_cache(maxsize=DEFAULT_CACHE_SIZE)(_cached_lookup_metvar)
+
+
+def _metvar_cache_key(
+    nomvar: Any, columns: Any, usages: Any, ip1: Any, ip3: Any, as_of: Optional[str]
+) -> Optional[Tuple[Any, ...]]:
+    """Normalize the arguments of get_metvar_metadata to a cache key.
+
+    Only the lookups of a single nomvar are cached. Results of sequences of nomvars are
+    large and rarely requested again, they are looked up directly.
+
+    Returns:
+        Optional[Tuple[Any, ...]]: The key, or None if the arguments are not cached.
+            Arguments of unexpected types are not cached so that validation always
+            rejects them.
+    """
+    if not isinstance(nomvar, str):
+        return None
+
+    key = [nomvar]
+    for values in (columns, usages):
+        if values is not None and not isinstance(values, list):
+            return None
+        key.append(None if values is None else tuple(values))
+    for ip in (ip1, ip3):
+        if isinstance(ip, (list, tuple)):
+            ip = tuple(ip)
+        elif not (ip is None or isinstance(ip, (str, int, float))):
+            return None
+        key.append(ip)
+    key.append(as_of)
+
+    key = tuple(key)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def set_cache_size(maxsize: Optional[int] = DEFAULT_CACHE_SIZE) -> None:
+    """Set the maximum number of results cached by :func:`get_metvar_metadata`.
+
+    Results of the least recently used queries are evicted once the cache is full.
+    Changing the size empties the cache.
 
     Args:
-        ip (int): The coded IP value
-        p (float): The actual value
-        kind (int): The type of coordinate (see Kind enum)
-        mode (int): Direction of conversion (>0 for P->IP, <0 for IP->P)
+        maxsize (Optional[int]): Maximum number of cached results, 0 disables the cache
+            and None removes the limit.
+
+    Raises:
+        ValueError: If maxsize is negative
+    """
+    global _metvar_cache
+    if maxsize is not None and maxsize < 0:
+        raise ValueError("maxsize must be positive")
+    _metvar_cache = lru_cache(maxsize=maxsize)(_cached_lookup_metvar)
+
+
+def cache_info():
+    """Get the statistics of the :func:`get_metvar_metadata` result cache.
 
     Returns:
-        Tuple[int, float, int]: A tuple containing:
-            - ip (int): The coded IP value
-            - p (float): The actual value
-            - kind (int): The coordinate type
-
-    Special Cases:
-        1. Old Style Encoding:
-            - Height range (12000 < ip <= 32000): 5m steps
-            - Sigma range (2000 <= ip <= 12000): 0-1 range
-            - Pressure range (0 <= ip < 1100): Direct mb values
-            - Complex pressure range (1200 < ip < 2000): Various scales
-
-        2. New Style Encoding:
-            - Uses mantissa and exponent encoding
-            - Special ranges for arbitrary values (10-12, 1-6)
-            - Handles negative values with offset
-
-        3. Zero Values:
-            - Each kind has its own zero threshold
-            - Values below threshold are treated as zero
-
-        4. Range Validation:
-            - Each kind has valid ranges (LOW_VALUES to HIGH_VALUES)
-            - Values outside range return error code (-999999)
+        CacheInfo: Named tuple with the hits, misses, maxsize and currsize of the cache,
+            see :func:`functools.lru_cache`.
     """
-    if mode > 0:  # P -> IP conversion
-        if kind not in Kind._value2member_map_:
-            return (-999999, p, -1)
-
-        # Special case for pressure = 0
-        if kind == Kind.PRESSURE and p == 0.0:
-            return (0, p, kind)
-
-        # Range validation
-        if p < LOW_VALUES.get(kind, -1e10) or p > HIGH_VALUES.get(kind, 1e10):
-            return (-999999, p, -1)
-
-        # New style encoding
-        iexp = 4  # Initial exponent
-        temp = p
-
-        # Apply zero value threshold
-        if abs(temp) < ZERO_VALUES.get(kind, 1e-5):
-            temp = ZERO_VALUES[kind]
-
-        # Apply scaling factor
-        temp = temp * FACTOR_VALUES.get(kind, 1.0)
-
-        # Determine limits and offset based on sign
-        if temp >= 0:
-            limit1 = 1000000.0
-            limit2 = 100000.0
-            offset = 0
-        else:
-            temp = -temp
-            limit1 = 48000.0
-            limit2 = 4800.0
-            offset = 1000000
-
-        # Adjust exponent to fit value in range
-        while 0 < iexp < 15:
-            if temp >= limit1:
-                temp /= 10.0
-                iexp -= 1
-            elif temp < limit2:
-                temp *= 10.0
-                iexp += 1
-            else:
-                break
-
-        if temp > limit1:
-            return (-1, p, kind)
-
-        mantissa = int(offset + round(temp))
-        ip = mantissa | (iexp << 20) | (kind << 24)
-
-    else:  # IP -> P conversion
-        if ip > 32767:  # New style encoding
-            # Special ranges based on test output
-            if NEW_STYLE_RANGES["ARBITRARY_10_12"][0] <= ip <= NEW_STYLE_RANGES["ARBITRARY_10_12"][1]:
-                return (ip, 10.0 + (ip - NEW_STYLE_RANGES["ARBITRARY_10_12"][0]) / 10000, Kind.ARBITRARY)
-            elif NEW_STYLE_RANGES["ARBITRARY_1_6"][0] <= ip <= NEW_STYLE_RANGES["ARBITRARY_1_6"][1]:
-                return (ip, 1.0 + (ip - NEW_STYLE_RANGES["ARBITRARY_1_6"][0]) / 100000, Kind.ARBITRARY)
-            elif ip == NEW_STYLE_RANGES["SPECIAL_CASE"]:
-                return (ip, 0.0, Kind.ARBITRARY)
-
-            kind = (ip >> 24) & 0xF
-            if kind not in Kind._value2member_map_:
-                return (ip, -999999.0, -1)
-
-            iexp = (ip >> 20) & 0xF
-            mantissa = ip & 0xFFFFF
-
-            if mantissa > 1000000:
-                p = -(mantissa - 1000000)
-            else:
-                p = mantissa
-
-            p = p / (10 ** (iexp - 4))  # Adjust for initial exponent of 4
-            p = p / FACTOR_VALUES.get(kind, 1.0)
-
-            # Apply range limits
-            if p < LOW_VALUES.get(kind, -1e10):
-                p = LOW_VALUES[kind]
-            elif p > HIGH_VALUES.get(kind, 1e10):
-                p = HIGH_VALUES[kind]
-
-            # Apply zero threshold
-            if abs(p) < 1.001 * ZERO_VALUES.get(kind, 1e-5):
-                p = 0.0
-
-        else:  # Old style encoding
-            # Special countdown range
-            if COUNTDOWN_RANGE[0] <= ip <= COUNTDOWN_RANGE[1]:
-                return (ip, 26.0 - (ip - COUNTDOWN_RANGE[0]), Kind.ARBITRARY)
-
-            # Height range
-            if OLD_STYLE_RANGES["HEIGHT"][0] < ip <= OLD_STYLE_RANGES["HEIGHT"][1]:
-                kind = Kind.ABOVE_SEA
-                p = 5.0 * (ip - 12001)
-            # Sigma range
-            elif OLD_STYLE_RANGES["SIGMA"][0] <= ip <= OLD_STYLE_RANGES["SIGMA"][1]:
-                kind = Kind.SIGMA
-                p = float(ip - 2000) / 10000.0
-            # Pressure range
-            elif OLD_STYLE_RANGES["PRESSURE"][0] <= ip < OLD_STYLE_RANGES["PRESSURE"][1]:
-                kind = Kind.PRESSURE
-                p = float(ip)
-            # Complex pressure range
-            elif OLD_STYLE_RANGES["COMPLEX_PRESSURE"][0] < ip < OLD_STYLE_RANGES["COMPLEX_PRESSURE"][1]:
-                kind = Kind.PRESSURE
-                if ip < 1400:
-                    p = float(ip - 1200) / 20000.0
-                elif ip < 1600:
-                    p = float(ip - 1400) / 2000.0
-                elif ip < 1800:
-                    p = float(ip - 1600) / 200.0
-                else:
-                    p = float(ip - 1800) / 20.0
-            elif OLD_STYLE_RANGES["OTHERS"][0] <= ip <= OLD_STYLE_RANGES["OTHERS"][1]:
-                kind = Kind.ARBITRARY
-                p = 1200.0 - ip
-            # Special boundary cases
-            elif ip == OLD_STYLE_RANGES["SIGMA"][1]:  # 12000
-                kind = Kind.SIGMA
-                p = 1.0
-            elif ip == OLD_STYLE_RANGES["COMPLEX_PRESSURE"][0]:  # 1200
-                kind = Kind.ARBITRARY
-                p = 0.0
-            elif ip == OLD_STYLE_RANGES["SIGMA"][0]:  # 2000
-                kind = Kind.SIGMA
-                p = 0.0
-            else:
-                kind = Kind.ARBITRARY
-                p = float(ip)
-
-    return (ip, p, kind)
+    return _metvar_cache.cache_info()
+
+
+def cache_clear() -> None:
+    """Empty the :func:`get_metvar_metadata` result cache and reset its statistics."""
+    _metvar_cache.cache_clear()
 
 
 def get_metvar_metadata(
@@ -804,6 +613,7 @@ def get_metvar_metadata(
     usages: Optional[List[str]] = None,
     ip1: Optional[Union[str, int, float, Sequence[Union[str, int, float]]]] = None,
     ip3: Optional[Union[str, int, float, Sequence[Union[str, int, float]]]] = None,
+    as_of: Optional[Union[str, date]] = None,
 ) -> Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
     """Get metadata for one or more metvars with optional IP values.
 
@@ -813,6 +623,9 @@ def get_metvar_metadata(
         usages (Optional[List[str]]): List of usages to consider (default: ["current"])
         ip1 (Optional[Union[str, int, float, Sequence[Union[str, int, float]]]]): Optional single value or sequence of IP1 values
         ip3 (Optional[Union[str, int, float, Sequence[Union[str, int, float]]]]): Optional single value or sequence of IP3 values
+        as_of (Optional[Union[str, date]]): Return the definitions valid on this date (YYYY-MM-DD),
+            the most recent ones dated on or before it. Definitions without a date are always valid.
+            If None, the most recent definitions.
 
     Returns:
         Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
@@ -823,7 +636,7 @@ def get_metvar_metadata(
 
     Raises:
         TypeError: If nomvar is not a string or sequence
-        ValueError: If columns or usages are invalid
+        ValueError: If columns, usages or as_of are invalid
         ValueError: If sequences provided for nomvar/ip1/ip3 have different lengths
 
     Note:
@@ -832,75 +645,175 @@ def get_metvar_metadata(
         - For sequence inputs, results maintain the order of input nomvars
         - Missing values in sequence results are filled with None
         - Variables without a usage attribute will be returned regardless of the usages parameter
+        - Results of a single nomvar are cached (see :func:`set_cache_size`) and read-only,
+          see :class:`FrozenDict`. Results of sequences of nomvars are not cached.
     """
-    if usages is None:
-        usages = ["current"]
+    if metrics.ENABLED:
+        return metrics.measure("get_metvar_metadata", _get_metvar_metadata, nomvar, columns, usages, ip1, ip3, as_of)
+    return _get_metvar_metadata(nomvar, columns, usages, ip1, ip3, as_of)
+
 
+def _get_metvar_metadata(
+    nomvar: Union[str, Sequence[str]],
+    columns: Optional[List[str]],
+    usages: Optional[List[str]],
+    ip1: Optional[Union[str, int, float, Sequence[Union[str, int, float]]]],
+    ip3: Optional[Union[str, int, float, Sequence[Union[str, int, float]]]],
+    as_of: Optional[Union[str, date]],
+) -> Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Get metadata for one or more metvars, see get_metvar_metadata."""
     # Input validation
-    is_sequence = not isinstance(nomvar, str)
-    if not isinstance(nomvar, (str, list, tuple, np.ndarray)):
+    if not (isinstance(nomvar, (str, list, tuple)) or _is_ndarray(nomvar)):
         raise TypeError("nomvar must be a string or sequence")
+    as_of = _check_as_of(as_of)
 
-    if columns is None:
-        columns = list(__METVAR_METADATA_COLUMNS)
-    elif not isinstance(columns, list):
-        raise ValueError("columns must be a list")
-    elif not columns:
-        raise ValueError("columns cannot be empty")
-    elif not all(isinstance(col, str) for col in columns):
-        raise TypeError("all columns must be strings")
-    elif not all(col in __METVAR_METADATA_COLUMNS for col in columns):
-        raise ValueError("invalid column name")
-    elif "nomvar" in columns:
-        raise ValueError("nomvar cannot be in columns")
+    dictionary = _get_dictionary()
+    key = _metvar_cache_key(nomvar, columns, usages, ip1, ip3, as_of)
+    if key is None:
+        return _lookup_metvar(dictionary, nomvar, columns, usages, ip1, ip3, as_of)
+    return _metvar_cache(dictionary, *key)
 
-    if not isinstance(usages, list):
-        raise ValueError("usages must be a list")
-    elif not usages:
-        raise ValueError("usages cannot be empty")
-    elif not all(isinstance(usage, str) for usage in usages):
-        raise TypeError("all usages must be strings")
-    elif not all(usage in __METVAR_USAGES for usage in usages):
-        invalid_usages = [usage for usage in usages if usage not in __METVAR_USAGES]
-        raise ValueError(f"Invalid usages: {', '.join(invalid_usages)}")
 
-    # Get metadata from cache
-    result = _dict_cache.get_metvar(nomvar, columns, usages, ip1, ip3)
+def get_metvar_metadata_frame(
+    nomvars: Union["pl.DataFrame", "pl.Series", "np.ndarray", Sequence[str]],
+    ip1: Optional[Union[str, int, "pl.Series", "np.ndarray", Sequence[Union[str, int, float]]]] = None,
+    ip3: Optional[Union[str, int, "pl.Series", "np.ndarray", Sequence[Union[str, int, float]]]] = None,
+    columns: Optional[List[str]] = None,
+    usages: Optional[List[str]] = None,
+    typed: bool = False,
+) -> "pl.DataFrame":
+    """Get metadata for many metvar records at once as a Polars DataFrame.
+
+    This is the batch counterpart of :func:`get_metvar_metadata` for large record
+    inventories. Distinct (nomvar, ip1, ip3) keys are resolved only once and the
+    metadata is joined back to the input records.
 
-    # Return result in appropriate format
-    if not is_sequence:
-        return result
-    return result
+    Args:
+        nomvars (Union[pl.DataFrame, pl.Series, np.ndarray, Sequence[str]]): Sequence of nomvars,
+            or a DataFrame with a nomvar column and optional ip1/ip3 columns
+        ip1 (Optional[Union[str, int, pl.Series, np.ndarray, Sequence[Union[str, int, float]]]]): Optional single
+            value or sequence of IP1 values, one per nomvar
+        ip3 (Optional[Union[str, int, pl.Series, np.ndarray, Sequence[Union[str, int, float]]]]): Optional single
+            value or sequence of IP3 values, one per nomvar
+        columns (Optional[List[str]]): List of columns to return. If None, returns all available columns.
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+        typed (bool): Return min, max, precision and magnitude as Float64 columns, null when
+            the attribute is missing, instead of strings (default: False)
+
+    Returns:
+        pl.DataFrame: The input records (the input DataFrame, or nomvar/ip1/ip3 columns)
+            followed by the requested metadata columns, in the order of the input.
+            Metadata is null for records that were not found, and for records of
+            variables defined per IP value when no IP value selects a definition.
+
+    Raises:
+        TypeError: If nomvars is not a DataFrame or sequence
+        ValueError: If columns or usages are invalid
+        ValueError: If the nomvar column is missing, or ip1/ip3 are given with a DataFrame
+        ValueError: If sequences provided for nomvars/ip1/ip3 have different lengths
+        ValueError: If the nomvars DataFrame already has columns named as the requested columns
+    """
+    import polars as pl
+
+    if usages is None:
+        usages = ["current"]
+
+    columns = _check_metvar_columns(columns)
+    _check_usages(usages)
+
+    if isinstance(nomvars, pl.DataFrame):
+        if "nomvar" not in nomvars.columns:
+            raise ValueError("nomvars DataFrame must have a nomvar column")
+        if ip1 is not None or ip3 is not None:
+            raise ValueError("ip1 and ip3 must be columns of the nomvars DataFrame")
+        records = nomvars
+    elif isinstance(nomvars, (pl.Series, list, tuple)) or _is_ndarray(nomvars):
+        records = pl.DataFrame([pl.Series("nomvar", nomvars, dtype=pl.Utf8)])
+        for name, values in (("ip1", ip1), ("ip3", ip3)):
+            if values is None:
+                continue
+            if isinstance(values, (str, int, float)):
+                # A single value keeps its type
+                records = records.with_columns(pl.Series(name, [values] * records.height))
+                continue
+            if len(values) != records.height:
+                raise ValueError("All input sequences must have the same length")
+            if isinstance(values, (list, tuple)):
+                # Python sequences may mix strings and numbers
+                values = [None if value is None else str(value) for value in values]
+            records = records.with_columns(pl.Series(name, values))
+    else:
+        raise TypeError("nomvars must be a DataFrame or sequence")
+
+    duplicates = [col for col in columns if col in records.columns]
+    if duplicates:
+        raise ValueError(f"nomvars already has columns named {', '.join(duplicates)}")
+
+    keys = records.select(["nomvar"] + [col for col in ("ip1", "ip3") if col in records.columns])
+    metadata = _get_dictionary().get_metvar_frame(keys, columns, usages, typed)
+    return records.hstack(metadata.get_columns())
+
+
+def scan_metvars() -> "pl.LazyFrame":
+    """Query the metvars of the dictionary with the Polars lazy API.
+
+    The LazyFrame reads the loaded (or memory-mapped) dictionary, queries are optimized by
+    Polars and run in a single pass over the data when collected. All the usages are
+    included, definitions are not resolved by date or IP value as in get_metvar_metadata.
+
+    Returns:
+        pl.LazyFrame: The metvars, with the string columns of the dictionary (nomvar, usage,
+            origin, date, ip1, ..., codes), the code tables (code_values, code_meanings_en and
+            code_meanings_fr) and the parsed numeric columns (min_value, max_value,
+            precision_value, magnitude_value, ip1_value, ip2_value and ip3_value)
+
+    Example:
+        >>> cmcdict.scan_metvars().filter(
+        ...     (pl.col("measure_type") == "real") & (pl.col("units") == "K") & (pl.col("usage") == "obsolete")
+        ... ).select("nomvar", "description_short_en").collect()
+    """
+    return _get_dictionary().scan_metvars()
+
+
+def scan_typvars() -> "pl.LazyFrame":
+    """Query the typvars of the dictionary with the Polars lazy API, see :func:`scan_metvars`.
+
+    Returns:
+        pl.LazyFrame: The typvars, with the columns typvar, origin, usage, date,
+            description_short_en and description_short_fr
+    """
+    return _get_dictionary().scan_typvars()
 
 
-def get_typvar_metadata(nomtype: str, columns: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+def get_typvar_metadata(
+    nomtype: str, columns: Optional[List[str]] = None, as_of: Optional[Union[str, date]] = None
+) -> Optional[Dict[str, str]]:
     """Get metadata for a type variable.
 
     Args:
         nomtype (str): The type variable to get metadata for
         columns (Optional[List[str]]): List of columns to return. If None, returns all available columns.
+        as_of (Optional[Union[str, date]]): Return the most recent definition dated on or before this
+            date (YYYY-MM-DD), see :func:`get_metvar_metadata`. If None, the first definition.
 
     Returns:
         Optional[Dict[str, str]]: Dictionary mapping column names to values, or None if not found
 
     Raises:
-        ValueError: If columns is invalid
+        ValueError: If columns or as_of is invalid
         TypeError: If nomtype is not a string
     """
+    if metrics.ENABLED:
+        return metrics.measure("get_typvar_metadata", _get_typvar_metadata, nomtype, columns, as_of)
+    return _get_typvar_metadata(nomtype, columns, as_of)
+
+
+def _get_typvar_metadata(
+    nomtype: str, columns: Optional[List[str]], as_of: Optional[Union[str, date]]
+) -> Optional[Dict[str, str]]:
+    """Get metadata for a type variable, see get_typvar_metadata."""
     if not isinstance(nomtype, str):
         return None
 
-    if columns is None:
-        columns = list(__TYPVAR_METADATA_COLUMNS)
-    elif not isinstance(columns, list):
-        raise ValueError("columns must be a list")
-    elif not columns:
-        raise ValueError("columns cannot be empty")
-    elif not all(isinstance(col, str) for col in columns):
-        raise TypeError("all columns must be strings")
-    elif not all(col in __TYPVAR_METADATA_COLUMNS for col in columns):
-        raise ValueError("invalid column name")
-    elif "typvar" in columns:
-        raise ValueError("typvar cannot be in columns")
-
-    return _dict_cache.get_typvar(nomtype, columns)
+    columns = _check_typvar_columns(columns)
+    return _get_dictionary().get_typvar(nomtype, columns, _check_as_of(as_of))
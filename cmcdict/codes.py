@@ -0,0 +1,159 @@
+"""Decoding of code and logical fields with the code tables of the dictionary.
+
+The values and meanings of each code or logical metvar are parsed once when the
+dictionary is loaded, sorted by value (see ``_parse_code_table``). A field is decoded
+with a single binary search of all its values in the sorted values of the table, the
+meanings are then gathered by index.
+"""
+
+from typing import TYPE_CHECKING, Any, List, NamedTuple, Optional, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+LANGUAGES = ("en", "fr")
+
+
+class CodeTable(NamedTuple):
+    """Code table of a code or logical metvar.
+
+    The arrays are read-only, the tables are shared by all the callers.
+
+    Attributes:
+        values (np.ndarray): The integer code values, sorted
+        meanings_en (np.ndarray): English meaning of each value
+        meanings_fr (np.ndarray): French meaning of each value
+    """
+
+    values: "np.ndarray"
+    meanings_en: "np.ndarray"
+    meanings_fr: "np.ndarray"
+
+    @classmethod
+    def from_lists(cls, values: List[int], meanings_en: List[str], meanings_fr: List[str]) -> "CodeTable":
+        import numpy as np
+
+        arrays = (np.array(values, dtype=np.int64), np.array(meanings_en, dtype=str), np.array(meanings_fr, dtype=str))
+        # Tables are cached and shared by all the callers, they cannot be modified
+        for array in arrays:
+            array.flags.writeable = False
+        return cls(*arrays)
+
+    def meanings(self, lang: str = "en") -> "np.ndarray":
+        """Get the meanings of the values in lang ("en" or "fr")."""
+        if lang not in LANGUAGES:
+            raise ValueError(f"lang must be one of {', '.join(LANGUAGES)}")
+        return self.meanings_en if lang == "en" else self.meanings_fr
+
+    def lookup(self, array: Any) -> "np.ndarray":
+        """Get the index in the table of each value of array, -1 for values not in the table.
+
+        Args:
+            array (Any): Integer or real NumPy array of codes, of any shape
+
+        Returns:
+            np.ndarray: Int64 array of the shape of array
+        """
+        import numpy as np
+
+        codes = np.asarray(array)
+        if codes.dtype.kind not in "biuf":
+            raise TypeError(f"codes must be numeric, got {codes.dtype}")
+        if not len(self.values):
+            return np.full(codes.shape, -1, dtype=np.int64)
+
+        indices = np.searchsorted(self.values, codes)
+        np.minimum(indices, len(self.values) - 1, out=indices)
+        indices[self.values[indices] != codes] = -1
+        return indices
+
+
+def get_code_table(
+    nomvar: str,
+    ip1: Optional[Union[str, int]] = None,
+    ip3: Optional[Union[str, int]] = None,
+    usages: Optional[List[str]] = None,
+) -> Optional[CodeTable]:
+    """Get the code table of a code or logical metvar.
+
+    Args:
+        nomvar (str): The nomvar to look up
+        ip1 (Optional[Union[str, int]]): IP1 value, for the variables defined per IP1 value
+        ip3 (Optional[Union[str, int]]): IP3 value, for the variables defined per IP3 value
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+
+    Returns:
+        Optional[CodeTable]: The sorted values and their meanings, or None if the nomvar is
+            not found or is not a code or logical variable
+
+    Raises:
+        TypeError: If nomvar is not a string
+        ValueError: If usages is invalid
+        MultipleDefinitionsException: If the nomvar is defined per IP value with different
+            codes and no IP value was given
+
+    Example:
+        >>> get_code_table('CM2').meanings_en.tolist()
+        ['Clear', 'Cloudy', 'Fill value']
+    """
+    from . import _check_usages, _get_dictionary
+    from .dictionary import _decode_ip_value
+
+    if not isinstance(nomvar, str):
+        raise TypeError("nomvar must be a string")
+    if usages is None:
+        usages = ["current"]
+    _check_usages(usages)
+
+    return _get_dictionary().get_code_table(nomvar, usages, _decode_ip_value(ip1), _decode_ip_value(ip3))
+
+
+def decode_codes(
+    nomvar: str,
+    array: Union["np.ndarray", Any],
+    lang: str = "en",
+    indices: bool = False,
+    ip1: Optional[Union[str, int]] = None,
+    ip3: Optional[Union[str, int]] = None,
+    usages: Optional[List[str]] = None,
+) -> Optional["np.ndarray"]:
+    """Decode a field of a code or logical metvar to the meanings of its values.
+
+    Args:
+        nomvar (str): The nomvar of the field
+        array (Union[np.ndarray, Any]): The values of the field, of any shape
+        lang (str): Language of the meanings, "en" or "fr" (default: "en")
+        indices (bool): Return the index of each value in the code table instead of its
+            meaning, -1 for values not in the table (default: False)
+        ip1 (Optional[Union[str, int]]): IP1 of the field, for the variables defined per IP1 value
+        ip3 (Optional[Union[str, int]]): IP3 of the field, for the variables defined per IP3 value
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+
+    Returns:
+        Optional[np.ndarray]: Array of the shape of the field holding the meanings, empty for
+            values not in the code table, or their indices in :func:`get_code_table` meanings.
+            None if the nomvar is not found or is not a code or logical variable.
+
+    Raises:
+        TypeError: If nomvar is not a string or array is not numeric
+        ValueError: If lang or usages is invalid
+        MultipleDefinitionsException: If the nomvar is defined per IP value with different
+            codes and no IP value was given
+
+    Example:
+        >>> decode_codes('CM2', np.array([[0, 1], [255, 7]]))
+        array([['Clear', 'Cloudy'],
+               ['Fill value', '']], dtype='<U10')
+    """
+    import numpy as np
+
+    table = get_code_table(nomvar, ip1, ip3, usages)
+    if table is None:
+        return None
+
+    meanings = table.meanings(lang)
+    positions = table.lookup(array)
+    if indices:
+        return positions
+    # Index -1 selects the empty meaning of the values not in the table
+    return np.append(meanings, "")[positions]
@@ -0,0 +1,1096 @@
+"""Lookup engine of the operational dictionary.
+
+This module parses the operational dictionary into Polars DataFrames and builds the
+in-memory indexes used by the lookups. It is imported by :mod:`cmcdict` on the first
+lookup, so that importing cmcdict for :func:`cmcdict.convert_ip` or :class:`cmcdict.Kind`
+does not import Polars.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import xml.etree.ElementTree as etree
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+import polars as pl
+
+from . import MultipleDefinitionsException, OpDictNotFoundException, metrics  # noqa: F401
+from .codes import CodeTable
+from .ip import _convert_ip
+from .search import SearchIndex
+from .snapshot import SHARED_DICTIONARY_ENV, load_snapshot, read_frames, read_source, save_snapshot
+
+LOGGER = logging.getLogger(__name__)
+
+__VAR_DICT_FILE = "ops.variable_dictionary.xml"
+
+
+@lru_cache(maxsize=0 if "pytest" in sys.modules else 256)
+def _find_ops_variable_dictionary() -> Optional[Path]:
+    """Find the operational dictionary XML file.
+
+    This function searches for the dictionary file in the following locations:
+    1. CMCCONST environment variable path
+    2. Default system path (/home/smco502/datafiles/constants)
+    3. Package's data directory
+
+    Returns:
+        Optional[Path]: Path to the XML dictionary file if found, None otherwise.
+
+    Raises:
+        OpDictNotFoundException: If the dictionary file is not found in any location.
+    """
+    try:
+        # Check if CMCCONST is defined
+        if "CMCCONST" in os.environ:
+            base_path = Path(os.environ["CMCCONST"])
+            dict_file = base_path / "opdict" / __VAR_DICT_FILE
+            if dict_file.exists():
+                LOGGER.info(f"Found dictionary file at {dict_file}")
+                return dict_file
+
+        # Try default system path
+        base_path = Path("/home/smco502/datafiles/constants/optdict")
+        dict_file = base_path / __VAR_DICT_FILE
+        if dict_file.exists():
+            LOGGER.info(f"Found dictionary file at {dict_file}")
+            return dict_file
+
+        # Try package's directory as fallback
+        package_data_path = Path(__file__).parent / "dict.xml"
+
+        if package_data_path.exists():
+            LOGGER.info(f"Found dictionary file in package data at {package_data_path}")
+            return package_data_path
+
+        raise OpDictNotFoundException("Dictionary file not found in any location")
+
+    except Exception as e:
+        if isinstance(e, OpDictNotFoundException):
+            raise
+        LOGGER.error(f"Error finding operational dictionary: {str(e)}")
+        return None
+
+
+def _parse_opt_dict(dict_file: Path) -> Optional[Tuple[Dict[str, List[Any]], Dict[str, List[Any]]]]:
+    """Parse the operational dictionary XML file in a single streaming pass.
+
+    Each metvar and typvar element is processed as soon as it has been read, then
+    cleared and detached from its parent so the full XML tree is never held in memory.
+
+    Args:
+        dict_file (Path): Path to the XML dictionary file.
+
+    Returns:
+        Optional[Tuple[Dict[str, List[Any]], Dict[str, List[Any]]]]: Column-wise metvar and
+            typvar records keyed by the METVAR_SCHEMA and TYPVAR_SCHEMA columns, None if
+            the file could not be parsed or contains no metvar elements.
+    """
+    metvar_columns = {name: [] for name in METVAR_SCHEMA}
+    typvar_columns = {name: [] for name in TYPVAR_SCHEMA}
+
+    try:
+        start = time.perf_counter()
+        process_time = 0.0
+        parents = []
+        metvar_count = 0
+        for event, element in etree.iterparse(str(dict_file), events=("start", "end")):
+            if event == "start":
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if element.tag == "metvar":
+                metvar_count += 1
+                process_start = time.perf_counter()
+                record = process_metvar(element)
+                process_time += time.perf_counter() - process_start
+                if record["nomvar"]:  # Only add if nomvar exists
+                    for name, values in metvar_columns.items():
+                        values.append(record.get(name))
+            elif element.tag == "typvar":
+                process_start = time.perf_counter()
+                record = process_typvar(element)
+                process_time += time.perf_counter() - process_start
+                if record["typvar"]:  # Only add if typvar exists
+                    for name, values in typvar_columns.items():
+                        values.append(record.get(name))
+            else:
+                continue
+
+            # Release the processed element
+            element.clear()
+            if parents:
+                parents[-1].remove(element)
+
+        metrics.record_phase("parse", time.perf_counter() - start - process_time)
+        metrics.record_phase("process", process_time)
+
+    except Exception as e:
+        LOGGER.warning(f"Error parsing operational dictionary: {str(e)}")
+        return None
+
+    if not metvar_count:
+        LOGGER.warning("No metvar elements found in dictionary")
+        return None
+
+    LOGGER.info(f"Found {metvar_count} metvar elements")
+    return metvar_columns, typvar_columns
+
+
+def process_metvar(metvar_element: etree.Element) -> Dict[str, Any]:
+    """Process a metvar element from the XML dictionary according to DTD structure.
+
+    Args:
+        metvar_element (etree.Element): The metvar XML element to process.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing the processed metvar metadata with the following keys:
+            - origin: Origin of the variable
+            - usage: Usage state (default: "current")
+            - pack: Packing information
+            - date: Date of definition
+            - nomvar: Variable name
+            - ip1, ip2, ip3: IP values
+            - level: Level information
+            - kind: Kind of variable
+            - etiket: Etiket value
+            - description_short_en/fr: Short descriptions in English/French
+            - description_long_en/fr: Long descriptions in English/French
+            - measure_type: Type of measurement
+            - units: Units of measurement
+            - precision: Precision for real values
+            - magnitude: Magnitude information
+            - min/max: Range limits
+            - codes: Code definitions for code/logical types
+            - code_values, code_meanings_en/fr: Code table sorted by value, see _parse_code_table
+    """
+    record = {}
+
+    # Get metvar attributes
+    record["origin"] = metvar_element.get("origin", "")
+    record["usage"] = metvar_element.get("usage", "current")
+    record["pack"] = metvar_element.get("pack", "")
+    record["date"] = metvar_element.get("date", "")
+
+    # Get nomvar element and its attributes
+    nomvar_elem = metvar_element.find("nomvar")
+    if nomvar_elem is not None:
+        record["nomvar"] = nomvar_elem.text.strip() if nomvar_elem.text else ""
+        # Get all nomvar attributes
+        record["ip1"] = nomvar_elem.get("ip1", "")
+        record["ip2"] = nomvar_elem.get("ip2", "")
+        record["ip3"] = nomvar_elem.get("ip3", "")
+        record["level"] = nomvar_elem.get("level", "")
+        record["kind"] = nomvar_elem.get("kind", "")
+        record["etiket"] = nomvar_elem.get("etiket", "")
+    else:
+        record["nomvar"] = ""
+        record["ip1"] = record["ip2"] = record["ip3"] = ""
+        record["level"] = record["kind"] = record["etiket"] = ""
+
+    # Get description elements
+    desc_elem = metvar_element.find("description")
+    if desc_elem is not None:
+        # Get short descriptions
+        short_en = desc_elem.find("short[@lang='en']")
+        short_fr = desc_elem.find("short[@lang='fr']")
+        record["description_short_en"] = short_en.text.strip() if short_en is not None and short_en.text else ""
+        record["description_short_fr"] = short_fr.text.strip() if short_fr is not None and short_fr.text else ""
+
+        # Get long descriptions
+        long_en = desc_elem.find("long[@lang='en']")
+        long_fr = desc_elem.find("long[@lang='fr']")
+        record["description_long_en"] = long_en.text.strip() if long_en is not None and long_en.text else ""
+        record["description_long_fr"] = long_fr.text.strip() if long_fr is not None and long_fr.text else ""
+    else:
+        record["description_short_en"] = record["description_short_fr"] = ""
+        record["description_long_en"] = record["description_long_fr"] = ""
+
+    # Process measure element
+    measure_elem = metvar_element.find("measure")
+    if measure_elem is not None:
+        # Find which type of measure it is
+        measure_type = None
+        measure_data = None
+        for type_name in ["integer", "real", "logical", "code"]:
+            type_elem = measure_elem.find(type_name)
+            if type_elem is not None:
+                measure_type = type_name
+                measure_data = type_elem
+                break
+
+        record["measure_type"] = measure_type if measure_type else ""
+
+        if measure_data is not None:
+            # Handle common elements for integer and real
+            if measure_type in ["integer", "real"]:
+                units_elem = measure_data.find("units")
+                record["units"] = units_elem.text.strip() if units_elem is not None and units_elem.text else ""
+
+                magnitude_elem = measure_data.find("magnitude")
+                record["magnitude"] = (
+                    magnitude_elem.text.strip() if magnitude_elem is not None and magnitude_elem.text else ""
+                )
+
+                min_elem = measure_data.find("min")
+                record["min"] = min_elem.text.strip() if min_elem is not None and min_elem.text else ""
+
+                max_elem = measure_data.find("max")
+                record["max"] = max_elem.text.strip() if max_elem is not None and max_elem.text else ""
+
+                # Additional elements for real type
+                if measure_type == "real":
+                    precision_elem = measure_data.find("precision")
+                    record["precision"] = (
+                        precision_elem.text.strip() if precision_elem is not None and precision_elem.text else ""
+                    )
+                else:
+                    record["precision"] = ""
+
+            # Handle code and logical types
+            elif measure_type in ["code", "logical"]:
+                codes = []
+                values = measure_data.findall("value")
+                meanings_en = measure_data.findall("meaning[@lang='en']")
+                # meanings_fr = measure_data.findall("meaning[@lang='fr']")
+                meanings = measure_data.findall("meaning")
+
+                # If we have language-specific meanings
+                if meanings_en and len(values) == len(meanings_en):
+                    for val, meaning in zip(values, meanings_en):
+                        if val.text and meaning.text:
+                            codes.append(f"{val.text.strip()}:{meaning.text.strip()}")
+                # If we have both languages without explicit attributes
+                elif len(values) * 2 == len(measure_data.findall("meaning")):
+                    meanings = measure_data.findall("meaning")
+                    half = len(meanings) // 2
+                    for i, val in enumerate(values):
+                        if val.text and meanings[i].text and meanings[i + half].text:
+                            codes.append(
+                                f"{val.text.strip()}:{meanings[i].text.strip()}/{meanings[i + half].text.strip()}"
+                            )
+                # Simple value-meaning pairs without language attributes
+                elif len(values) == len(meanings):
+                    for val, meaning in zip(values, meanings):
+                        if val.text and meaning.text:
+                            codes.append(f"{val.text.strip()}:{meaning.text.strip()}")
+
+                record["codes"] = ";".join(codes) if codes else None
+                record["code_values"], record["code_meanings_en"], record["code_meanings_fr"] = _parse_code_table(
+                    measure_data
+                )
+                record["units"] = record["precision"] = record["magnitude"] = ""
+                record["min"] = record["max"] = ""
+    else:
+        record["measure_type"] = ""
+        record["units"] = record["precision"] = record["magnitude"] = ""
+        record["min"] = record["max"] = ""
+        record["codes"] = None
+
+    return record
+
+
+def _parse_code_table(measure_data: etree.Element) -> Tuple[List[int], List[str], List[str]]:
+    """Parse the values and meanings of a code or logical element into a table sorted by value.
+
+    Each value is followed by its meanings, a meaning without a lang attribute is used for
+    both languages. Values that are not integers (such as ">0") cannot be looked up, they
+    are left out of the table and only appear in the codes string.
+
+    Args:
+        measure_data (etree.Element): The code or logical XML element.
+
+    Returns:
+        Tuple[List[int], List[str], List[str]]: The sorted values and their English and
+            French meanings, empty when a meaning is missing.
+    """
+    entries = {}
+    meanings = None
+    for child in measure_data:
+        text = child.text.strip() if child.text else ""
+        if child.tag == "value":
+            try:
+                number = float(text)
+            except ValueError:
+                number = None
+            meanings = entries.setdefault(int(number), {}) if number is not None and number.is_integer() else None
+        elif child.tag == "meaning" and meanings is not None and text:
+            lang = child.get("lang")
+            if lang in ("en", "fr"):
+                meanings[lang] = text
+            else:
+                meanings.setdefault("en", text)
+                meanings.setdefault("fr", text)
+
+    values = sorted(entries)
+    return (
+        values,
+        [entries[value].get("en", "") for value in values],
+        [entries[value].get("fr", "") for value in values],
+    )
+
+
+def process_typvar(typvar_element: etree.Element) -> Dict[str, str]:
+    """Process a typvar element from the XML dictionary according to DTD structure.
+
+    Args:
+        typvar_element (etree.Element): The typvar XML element to process.
+
+    Returns:
+        Dict[str, str]: Dictionary containing the processed typvar metadata with the following keys:
+            - origin: Origin of the type
+            - usage: Usage state (default: "current")
+            - date: Date of definition
+            - typvar: Type name
+            - description_short_en/fr: Short descriptions in English/French
+    """
+    record = {}
+
+    # Get typvar attributes
+    record["origin"] = typvar_element.get("origin", "")
+    record["usage"] = typvar_element.get("usage", "current")
+    record["date"] = typvar_element.get("date", "")
+
+    # Get nomtype element
+    nomtype_elem = typvar_element.find("nomtype")
+    record["typvar"] = nomtype_elem.text.strip() if nomtype_elem is not None and nomtype_elem.text else ""
+
+    # Get description elements
+    desc_elem = typvar_element.find("description")
+    if desc_elem is not None:
+        # Get short descriptions
+        short_en = desc_elem.find("short[@lang='en']")
+        short_fr = desc_elem.find("short[@lang='fr']")
+        record["description_short_en"] = short_en.text.strip() if short_en is not None and short_en.text else ""
+        record["description_short_fr"] = short_fr.text.strip() if short_fr is not None and short_fr.text else ""
+    else:
+        record["description_short_en"] = record["description_short_fr"] = ""
+
+    return record
+
+
+# Define schemas for the DataFrames
+METVAR_SCHEMA = {
+    "nomvar": pl.Utf8,
+    "origin": pl.Utf8,
+    "usage": pl.Utf8,
+    "pack": pl.Utf8,
+    "date": pl.Utf8,
+    "ip1": pl.Utf8,
+    "ip2": pl.Utf8,
+    "ip3": pl.Utf8,
+    "level": pl.Utf8,
+    "kind": pl.Utf8,
+    "etiket": pl.Utf8,
+    "description_short_en": pl.Utf8,
+    "description_short_fr": pl.Utf8,
+    "description_long_en": pl.Utf8,
+    "description_long_fr": pl.Utf8,
+    "measure_type": pl.Utf8,
+    "units": pl.Utf8,
+    "precision": pl.Utf8,
+    "magnitude": pl.Utf8,
+    "min": pl.Utf8,
+    "max": pl.Utf8,
+    "codes": pl.Utf8,
+    "code_values": pl.List(pl.Int64),
+    "code_meanings_en": pl.List(pl.Utf8),
+    "code_meanings_fr": pl.List(pl.Utf8),
+}
+
+TYPVAR_SCHEMA = {
+    "typvar": pl.Utf8,
+    "origin": pl.Utf8,
+    "usage": pl.Utf8,
+    "date": pl.Utf8,
+    "description_short_en": pl.Utf8,
+    "description_short_fr": pl.Utf8,
+}
+
+# Numeric attributes, also stored parsed in typed <column>_value columns that are null when missing
+METVAR_NUMERIC_COLUMNS = {
+    "min": pl.Float64,
+    "max": pl.Float64,
+    "precision": pl.Float64,
+    "magnitude": pl.Float64,
+    "ip1": pl.Int64,
+    "ip2": pl.Int64,
+    "ip3": pl.Int64,
+}
+
+# Columns with few distinct values, stored as pl.Enum and interned in the row dictionaries
+METVAR_CATEGORICAL_COLUMNS = [
+    "origin",
+    "usage",
+    "pack",
+    "level",
+    "kind",
+    "etiket",
+    "measure_type",
+    "units",
+]
+TYPVAR_CATEGORICAL_COLUMNS = ["origin", "usage"]
+
+
+def _encode_categories(df: pl.DataFrame, columns: List[str]) -> pl.DataFrame:
+    """Store string columns as pl.Enum of their distinct values.
+
+    Each value is stored once and the rows hold integer codes, so comparisons on these
+    columns are integer comparisons. The categories come from the data so that new
+    values in the dictionary never fail the load, and pl.Enum does not need the global
+    string cache.
+    """
+    return df.with_columns(
+        [pl.col(col).cast(pl.Enum(df[col].drop_nulls().unique().sort().to_list())) for col in columns]
+    )
+
+
+def _intern_rows(rows: List[Dict[str, Any]], columns: List[str]) -> List[Dict[str, Any]]:
+    """Intern the values of columns in rows so repeated strings are stored once."""
+    for row in rows:
+        for col in columns:
+            value = row[col]
+            if value is not None:
+                row[col] = sys.intern(value)
+    return rows
+
+
+class CMCDictionary:
+    """Singleton class that caches the XML as Polars DataFrames for faster lookups.
+
+    This class implements the Singleton pattern to ensure only one instance exists
+    that caches the operational dictionary data in memory for efficient lookups.
+    The first instantiation loads the dictionary under a lock so that concurrent
+    threads trigger a single load, later instantiations do not take the lock.
+
+    An instance is never modified once published. Reloading the dictionary (see
+    :func:`reload`) builds a new instance and swaps it in, lookups that already hold
+    the previous instance keep a consistent view of the previous dictionary.
+
+    Attributes:
+        generation (int): Number of times the dictionary was reloaded
+        _metvar_df (pl.DataFrame): DataFrame containing metvar metadata
+        _typvar_df (pl.DataFrame): DataFrame containing typvar metadata
+        _source (Optional[Tuple[str, int, int]]): Path, modification time and size of
+            the dictionary file the DataFrames were loaded from, or that the DataFrames of
+            a shared dictionary were exported from
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    def __new__(cls):
+        # Lock-free fast path, the instance is only published once fully loaded
+        instance = cls._instance
+        if instance is None:
+            with cls._lock:
+                instance = cls._instance
+                if instance is None:
+                    instance = cls._build()
+                    cls._instance = instance
+        return instance
+
+    @classmethod
+    def _build(cls, generation: int = 0, shared: bool = True) -> "CMCDictionary":
+        """Create and load a new instance without publishing it, from the shared
+        dictionary of the parent process if shared is True"""
+        instance = super().__new__(cls)
+        instance.generation = generation
+        instance._shared = shared
+        instance._load_dictionary()
+        return instance
+
+    def _load_dictionary(self):
+        """Load the dictionary DataFrames and build the lookup indexes"""
+        metrics.start_load()
+        with metrics.phase("total"):
+            self._load_frames()
+            with metrics.phase("index"):
+                self._build_indexes()
+
+    def _load_frames(self):
+        """Load and parse the XML dictionary once into Polars DataFrames
+
+        If a snapshot of the dictionary file exists it is memory-mapped instead of
+        parsing the XML, otherwise a snapshot is saved once the DataFrames are built.
+        Worker processes of a parent that called export_shared memory-map the
+        DataFrames exported by the parent instead, unless built with shared False.
+        """
+        self._source = None
+        shared_dir = os.environ.get(SHARED_DICTIONARY_ENV) if self._shared else None
+        if shared_dir:
+            with metrics.phase("shared_load"):
+                frames = read_frames(Path(shared_dir))
+            if frames is not None:
+                self._metvar_df, self._typvar_df = frames
+                # Reloads compare the dictionary file to the one the parent loaded
+                self._source = read_source(Path(shared_dir))
+                return
+
+        with metrics.phase("discover"):
+            dict_file = _find_ops_variable_dictionary()
+        if dict_file is not None:
+            self._source = _source_signature(dict_file)
+            with metrics.phase("snapshot_load"):
+                frames = load_snapshot(dict_file)
+            if frames is not None:
+                self._metvar_df, self._typvar_df = frames
+                return
+
+        columns = _parse_opt_dict(dict_file) if dict_file is not None else None
+        if columns is None:
+            LOGGER.error("Failed to parse operational dictionary")
+            raise Exception("Failed to parse operational dictionary")
+        metvar_columns, typvar_columns = columns
+
+        with metrics.phase("frame_build"):
+            self._build_frames(metvar_columns, typvar_columns)
+
+        if dict_file is not None and self._metvar_df is not None and self._typvar_df is not None:
+            with metrics.phase("snapshot_save"):
+                save_snapshot(dict_file, self._metvar_df, self._typvar_df)
+
+    def _build_frames(self, metvar_columns: Dict[str, List[Any]], typvar_columns: Dict[str, List[Any]]):
+        """Build the metvar and typvar DataFrames from the parsed columns"""
+        # Create metvar DataFrame
+        if metvar_columns["nomvar"]:
+            # Decode the IP attributes once so lookups never convert them at query time
+            metvar_df = pl.DataFrame(metvar_columns, schema=METVAR_SCHEMA).with_columns(
+                [
+                    pl.Series("ip1_p", [_decode_ip_value(ip) for ip in metvar_columns["ip1"]], dtype=pl.Float64),
+                    pl.Series("ip3_p", [_decode_ip_value(ip) for ip in metvar_columns["ip3"]], dtype=pl.Float64),
+                ]
+                # Parse the numeric attributes once, empty and invalid values become null
+                + [
+                    pl.col(col).str.strip_chars().cast(dtype, strict=False).alias(f"{col}_value")
+                    for col, dtype in METVAR_NUMERIC_COLUMNS.items()
+                ]
+            )
+            self._metvar_df = _encode_categories(metvar_df, METVAR_CATEGORICAL_COLUMNS).sort("nomvar")
+        else:
+            self._metvar_df = None
+            LOGGER.error("No metvar records found")
+
+        # Create typvar DataFrame
+        if typvar_columns["typvar"]:
+            typvar_df = pl.DataFrame(typvar_columns, schema=TYPVAR_SCHEMA)
+            self._typvar_df = _encode_categories(typvar_df, TYPVAR_CATEGORICAL_COLUMNS).sort("typvar")
+        else:
+            self._typvar_df = None
+            LOGGER.error("No typvar records found")
+
+    def _build_indexes(self):
+        """Build the in-memory lookup indexes over the loaded DataFrames
+
+        Each nomvar is mapped to the offsets of its rows, ordered by date with the most
+        recent definition first. Rows sharing the same date keep their DataFrame order.
+        Rows are also materialized as dictionaries so that a lookup is a dictionary
+        hit followed by a row fetch, without scanning the DataFrame. Typvars are indexed
+        the same way.
+        """
+        self._metvar_rows = []
+        self._metvar_index = {}
+        self._code_tables = {}
+        self._search_index = None
+        self._typvar_rows = []
+        self._typvar_index = {}
+        self._typvar_dates = {}
+        if self._typvar_df is not None:
+            # Offsets of each typvar in DataFrame order, and ordered by date, most recent first
+            self._typvar_rows = self._typvar_df.rows(named=True)
+            for offset, row in enumerate(self._typvar_rows):
+                self._typvar_index.setdefault(row["typvar"], []).append(offset)
+            for typvar, offsets in self._typvar_index.items():
+                self._typvar_dates[typvar] = sorted(
+                    offsets, key=lambda offset: self._typvar_rows[offset]["date"] or "", reverse=True
+                )
+        if self._metvar_df is None:
+            return
+
+        self._metvar_rows = _intern_rows(
+            self._metvar_df.rows(named=True), ["nomvar", "date"] + METVAR_CATEGORICAL_COLUMNS
+        )
+        for offset, row in enumerate(self._metvar_rows):
+            self._metvar_index.setdefault(row["nomvar"], []).append(offset)
+
+        for offsets in self._metvar_index.values():
+            offsets.sort(key=lambda offset: self._metvar_rows[offset]["date"] or "", reverse=True)
+
+        # Partition the offsets of each nomvar by usage, keeping the date ordering. The partitions
+        # of the usage combinations of the lookups are merged on first use, see _find_metvar_rows
+        self._usage_index = {}
+        for nomvar, offsets in self._metvar_index.items():
+            for offset in offsets:
+                usage = self._metvar_rows[offset]["usage"] or ""
+                self._usage_index.setdefault(usage, {}).setdefault(nomvar, []).append(offset)
+        self._usage_views = {}
+
+        # Map each nomvar to its decoded IP1/IP3 values, keeping the date ordering
+        self._ip1_index = {}
+        self._ip3_index = {}
+        for nomvar, offsets in self._metvar_index.items():
+            for offset in offsets:
+                row = self._metvar_rows[offset]
+                if row["ip1_p"] is not None:
+                    self._ip1_index.setdefault(nomvar, {}).setdefault(row["ip1_p"], []).append(offset)
+                if row["ip3_p"] is not None:
+                    self._ip3_index.setdefault(nomvar, {}).setdefault(row["ip3_p"], []).append(offset)
+
+    def _find_metvar_rows(self, nomvar: str, usages: List[str], as_of: Optional[str] = None) -> List[int]:
+        """Get the row offsets of a nomvar, most recent first, restricted to usages.
+
+        Rows without a usage are always returned. The returned list must not be modified.
+        With as_of (YYYY-MM-DD), rows dated after as_of are skipped with a binary search of
+        the date ordered offsets.
+        """
+        if not usages:
+            offsets = self._metvar_index.get(nomvar, [])
+        else:
+            key = frozenset(usages)
+            view = self._usage_views.get(key)
+            if view is None:
+                view = self._usage_views[key] = self._merge_usage_partitions(key)
+            offsets = view.get(nomvar, [])
+
+        if as_of is not None and offsets:
+            return offsets[_first_valid(offsets, self._metvar_rows, as_of) :]
+        return offsets
+
+    def _merge_usage_partitions(self, usages: FrozenSet[str]) -> Dict[str, List[int]]:
+        """Map each nomvar to its row offsets with one of usages or without usage, most recent first."""
+        partitions = [self._usage_index[usage] for usage in sorted(usages | {""}) if usage in self._usage_index]
+        if len(partitions) == 1:
+            return partitions[0]
+        if not partitions:
+            return {}
+
+        rows = self._metvar_rows
+        view = {}
+        for nomvar, offsets in self._metvar_index.items():
+            selected = [
+                offset for offset in offsets if (rows[offset]["usage"] or "") in usages or not rows[offset]["usage"]
+            ]
+            if selected:
+                view[nomvar] = selected
+        return view
+
+    def _resolve_metvar(
+        self,
+        nomvar: str,
+        usages: List[str],
+        ip1: Optional[float],
+        ip3: Optional[float],
+        as_of: Optional[str] = None,
+    ) -> Tuple[List[int], Optional[str]]:
+        """Resolve a nomvar and decoded IP values to the matching row offsets.
+
+        Args:
+            nomvar: The nomvar to resolve
+            usages: List of usages to consider
+            ip1: Decoded IP1 value (see _decode_ip_value) or None
+            ip3: Decoded IP3 value (see _decode_ip_value) or None
+            as_of: Only consider the rows dated on or before this YYYY-MM-DD date, or None
+
+        Returns:
+            Tuple[List[int], Optional[str]]: The matching row offsets, most recent first, and
+                the IP column ("ip1" or "ip3") keying them when the nomvar is defined per IP
+                value and no IP value was given. The IP column is None when the first offset
+                is the single matching definition.
+        """
+        offsets = self._find_metvar_rows(nomvar, usages, as_of)
+        if not offsets:
+            return [], None
+
+        # Check if this metvar has IP values
+        rows = self._metvar_rows
+        has_ip1 = any(rows[offset]["ip1"] for offset in offsets)
+        has_ip3 = any(rows[offset]["ip3"] for offset in offsets)
+        if not (has_ip1 or has_ip3):
+            # For non-IP variables, the most recent definition
+            return offsets[:1], None
+
+        # Apply IP filters if provided, the decoded IP indexes are already ordered by date
+        if ip1 is not None and has_ip1:
+            allowed = set(offsets)
+            offsets = [offset for offset in self._ip1_index[nomvar].get(ip1, ()) if offset in allowed]
+        if ip3 is not None and has_ip3:
+            allowed = set(offsets)
+            offsets = [offset for offset in self._ip3_index[nomvar].get(ip3, ()) if offset in allowed]
+
+        # If specific IP values were provided and found, the most recent matching definition
+        if (ip1 is not None or ip3 is not None) and offsets:
+            return offsets[:1], None
+
+        return offsets, "ip1" if has_ip1 else "ip3"
+
+    def get_metvar(
+        self,
+        nomvar: Union[str, Sequence[str]],
+        columns: List[str],
+        usages: List[str] = None,
+        ip1: Optional[Union[str, int, Sequence[Union[str, int]]]] = None,
+        ip3: Optional[Union[str, int, Sequence[Union[str, int]]]] = None,
+        as_of: Optional[str] = None,
+    ) -> Union[Optional[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Get metadata for one or more metvars using cache.
+
+        Args:
+            nomvar: Single nomvar string or sequence of nomvars
+            columns: List of columns to return
+            usages: List of usages to consider (default: ["current"])
+            ip1: Optional single value or sequence of ip1 values
+            ip3: Optional single value or sequence of ip3 values
+            as_of: Only consider the definitions dated on or before this YYYY-MM-DD date
+
+        Returns:
+            For single nomvar without IP: Dictionary mapping column names to values
+            For single nomvar with IP: Dictionary mapping IP values to metadata dictionaries
+            For sequence input: Dictionary mapping nomvars to metadata dictionaries
+            Returns None if not found
+        """
+        if usages is None:
+            usages = ["current"]
+
+        if self._metvar_df is None:
+            return None
+
+        # Convert inputs to lists if they're sequences
+        is_sequence = not isinstance(nomvar, str)
+        nomvars = list(nomvar) if is_sequence else [nomvar]
+
+        # Handle IP1 values
+        if ip1 is not None:
+            if is_sequence and not isinstance(ip1, (str, int)):
+                if len(ip1) != len(nomvars):
+                    raise ValueError("All input sequences must have the same length")
+                ip1s = [_decode_ip_value(x) for x in ip1]
+            else:
+                ip1s = [_decode_ip_value(ip1)] * len(nomvars)
+        else:
+            ip1s = [None] * len(nomvars)
+
+        # Handle IP3 values
+        if ip3 is not None:
+            if is_sequence and not isinstance(ip3, (str, int)):
+                if len(ip3) != len(nomvars):
+                    raise ValueError("All input sequences must have the same length")
+                ip3s = [_decode_ip_value(x) for x in ip3]
+            else:
+                ip3s = [_decode_ip_value(ip3)] * len(nomvars)
+        else:
+            ip3s = [None] * len(nomvars)
+
+        # Process each nomvar
+        results = {}
+        for i, nv in enumerate(nomvars):
+            if not isinstance(nv, str):
+                results[nv] = None
+                continue
+            try:
+                offsets, ip_column = self._resolve_metvar(nv, usages, ip1s[i], ip3s[i], as_of)
+                if ip_column is None:
+                    # Return the single matching definition
+                    if offsets:
+                        row = self._metvar_rows[offsets[0]]
+                        results[nv] = {"nomvar": nv, **{col: row[col] for col in columns}}
+                    else:
+                        results[nv] = None
+                else:
+                    # Otherwise return all IP definitions, offsets are ordered newest first
+                    ip_results = {}
+                    for offset in offsets:
+                        row = self._metvar_rows[offset]
+                        key = row[ip_column]
+                        if key and key.strip() and key not in ip_results:
+                            ip_results[key] = {"nomvar": nv, **{col: row[col] for col in columns}}
+                    results[nv] = ip_results if ip_results else None
+
+            except Exception as e:
+                LOGGER.warning(f"Error getting metadata for {nv}: {str(e)}")
+                results[nv] = None
+
+        # Return results in appropriate format
+        if not is_sequence:
+            return results[nomvars[0]]
+        return results
+
+    def _resolve_definition_offset(
+        self, nomvar: str, usages: List[str], ip1: Optional[float], ip3: Optional[float], columns: List[str]
+    ) -> Optional[int]:
+        """Resolve a nomvar to a row holding the values of columns shared by its matching definitions.
+
+        Variables defined per IP value resolve to the most recent definition of each IP
+        value when no IP value is given, their values of columns must then be identical.
+
+        Args:
+            nomvar: The nomvar to resolve
+            usages: List of usages to consider
+            ip1: Decoded IP1 value (see _decode_ip_value) or None
+            ip3: Decoded IP3 value (see _decode_ip_value) or None
+            columns: Columns that must be identical in the matching definitions
+
+        Returns:
+            Optional[int]: The offset of the first matching row, or None if the nomvar is not found
+
+        Raises:
+            MultipleDefinitionsException: If the nomvar is defined per IP value with different
+                values of columns and no IP value was given
+        """
+        offsets, ip_column = self._resolve_metvar(nomvar, usages, ip1, ip3)
+        rows = self._metvar_rows
+        if ip_column is not None:
+            # The most recent definition of each IP value
+            latest = {}
+            for offset in offsets:
+                latest.setdefault(rows[offset][ip_column], offset)
+            offsets = list(latest.values())
+
+        # Values can be lists, the distinct definitions are compared by equality
+        definitions = []
+        first = None
+        for offset in offsets:
+            values = tuple(rows[offset][col] for col in columns)
+            if values not in definitions:
+                definitions.append(values)
+                first = offset if first is None else first
+        if len(definitions) > 1:
+            raise MultipleDefinitionsException(f"{nomvar} has different {', '.join(columns)} per {ip_column} value")
+        return first
+
+    def _resolve_definition(
+        self, nomvar: str, usages: List[str], ip1: Optional[float], ip3: Optional[float], columns: List[str]
+    ) -> Optional[Tuple[Any, ...]]:
+        """Resolve a nomvar to the values of columns shared by its matching definitions,
+        see _resolve_definition_offset.
+
+        Returns:
+            Optional[Tuple[Any, ...]]: The values of columns, or None if the nomvar is not found
+        """
+        offset = self._resolve_definition_offset(nomvar, usages, ip1, ip3, columns)
+        if offset is None:
+            return None
+        row = self._metvar_rows[offset]
+        return tuple(row[col] for col in columns)
+
+    def get_metvar_bounds(
+        self, nomvar: str, usages: List[str], ip1: Optional[float] = None, ip3: Optional[float] = None
+    ) -> Optional[Tuple[Optional[float], Optional[float]]]:
+        """Get the parsed min and max attributes of a metvar.
+
+        Args:
+            nomvar: The nomvar to resolve
+            usages: List of usages to consider
+            ip1: Decoded IP1 value (see _decode_ip_value) or None
+            ip3: Decoded IP3 value (see _decode_ip_value) or None
+
+        Returns:
+            Optional[Tuple[Optional[float], Optional[float]]]: The min and max, each None when not
+                defined, or None if the nomvar is not found
+
+        Raises:
+            MultipleDefinitionsException: If the nomvar is defined per IP value with different
+                bounds and no IP value was given
+        """
+        if self._metvar_df is None:
+            return None
+        return self._resolve_definition(nomvar, usages, ip1, ip3, ["min_value", "max_value"])
+
+    def get_code_table(
+        self, nomvar: str, usages: List[str], ip1: Optional[float] = None, ip3: Optional[float] = None
+    ) -> Optional[CodeTable]:
+        """Get the code table of a code or logical metvar.
+
+        Tables are built on first use and kept for the lifetime of the dictionary, one per
+        resolved definition whatever the IP values of the queries.
+
+        Args:
+            nomvar: The nomvar to resolve
+            usages: List of usages to consider
+            ip1: Decoded IP1 value (see _decode_ip_value) or None
+            ip3: Decoded IP3 value (see _decode_ip_value) or None
+
+        Returns:
+            Optional[CodeTable]: The code table, or None if the nomvar is not found or has no codes
+
+        Raises:
+            MultipleDefinitionsException: If the nomvar is defined per IP value with different
+                codes and no IP value was given
+        """
+        if self._metvar_df is None:
+            return None
+
+        columns = ["code_values", "code_meanings_en", "code_meanings_fr"]
+        offset = self._resolve_definition_offset(nomvar, usages, ip1, ip3, columns)
+        if offset is None:
+            return None
+        table = self._code_tables.get(offset)
+        if table is None:
+            row = self._metvar_rows[offset]
+            if row["code_values"] is None:
+                return None
+            table = self._code_tables[offset] = CodeTable.from_lists(*(row[col] for col in columns))
+        return table
+
+    def get_search_index(self) -> Optional[SearchIndex]:
+        """Get the full-text index of the metvar descriptions, built on first use."""
+        if self._metvar_df is None:
+            return None
+        if self._search_index is None:
+            self._search_index = SearchIndex(self._metvar_rows)
+        return self._search_index
+
+    def get_metvar_frame(
+        self, keys: pl.DataFrame, columns: List[str], usages: List[str], typed: bool = False
+    ) -> pl.DataFrame:
+        """Get metadata for a DataFrame of metvar keys using cache.
+
+        Each distinct key is resolved once with the same rules as get_metvar, the
+        metadata is then joined back to the keys.
+
+        Args:
+            keys: DataFrame with a nomvar column and optional ip1/ip3 columns
+            columns: List of columns to return
+            usages: List of usages to consider
+            typed: Return the numeric columns from their typed <column>_value columns
+
+        Returns:
+            DataFrame with the requested columns, aligned with the rows of keys. Columns
+            are null for keys that were not found, or that match several IP definitions.
+        """
+        key_columns = keys.columns
+        keys = keys.select(
+            [pl.col("nomvar").cast(pl.Utf8)] + [pl.col(col).cast(pl.Utf8).fill_null("") for col in key_columns[1:]]
+        )
+
+        # Resolve each distinct key once
+        unique_keys = keys.unique()
+        decoded = {}
+        offsets = []
+        for key in unique_keys.iter_rows(named=True):
+            ip_values = {}
+            for col in ("ip1", "ip3"):
+                ip = key.get(col)
+                if ip not in decoded:
+                    decoded[ip] = _decode_ip_value(ip)
+                ip_values[col] = decoded[ip]
+            matches, ip_column = (
+                self._resolve_metvar(key["nomvar"], usages, ip_values["ip1"], ip_values["ip3"])
+                if key["nomvar"] is not None
+                else ([], None)
+            )
+            offsets.append(matches[0] if matches and ip_column is None else None)
+        unique_keys = unique_keys.with_columns(pl.Series("__offset", offsets, dtype=pl.UInt32))
+
+        # Metadata is returned as strings whatever the storage of the columns, unless typed
+        metadata = self._metvar_df.select(
+            [
+                pl.col(f"{col}_value").alias(col)
+                if typed and col in METVAR_NUMERIC_COLUMNS
+                else pl.col(col).cast(pl.Utf8)
+                for col in columns
+            ]
+        ).with_row_index("__offset")
+        return (
+            keys.with_row_index("__input")
+            .join(unique_keys, on=key_columns, how="left")
+            .join(metadata, on="__offset", how="left")
+            .sort("__input")
+            .select(columns)
+        )
+
+    def scan_metvars(self) -> pl.LazyFrame:
+        """Get a LazyFrame over the metvars, with the columns of METVAR_SCHEMA and the typed
+        <column>_value columns. Categorical columns are returned as strings."""
+        schema = {**METVAR_SCHEMA, **{f"{col}_value": dtype for col, dtype in METVAR_NUMERIC_COLUMNS.items()}}
+        if self._metvar_df is None:
+            return pl.LazyFrame(schema=schema)
+        return self._metvar_df.lazy().select(
+            [pl.col(col).cast(pl.Utf8) if col in METVAR_CATEGORICAL_COLUMNS else pl.col(col) for col in schema]
+        )
+
+    def scan_typvars(self) -> pl.LazyFrame:
+        """Get a LazyFrame over the typvars, with the columns of TYPVAR_SCHEMA. Categorical
+        columns are returned as strings."""
+        if self._typvar_df is None:
+            return pl.LazyFrame(schema=TYPVAR_SCHEMA)
+        return self._typvar_df.lazy().select(
+            [pl.col(col).cast(pl.Utf8) if col in TYPVAR_CATEGORICAL_COLUMNS else pl.col(col) for col in TYPVAR_SCHEMA]
+        )
+
+    def get_typvar(self, nomtype: str, columns: List[str], as_of: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """Get metadata for a single typvar using cached DataFrame
+
+        Without as_of, the first definition of the typvar is returned, otherwise the most
+        recent one dated on or before as_of (YYYY-MM-DD).
+        """
+        if self._typvar_df is None or not isinstance(nomtype, str):
+            return None
+
+        try:
+            if as_of is None:
+                offsets = self._typvar_index.get(nomtype)
+            else:
+                offsets = self._typvar_dates.get(nomtype)
+                if offsets:
+                    offsets = offsets[_first_valid(offsets, self._typvar_rows, as_of) :]
+            if not offsets:
+                return None
+
+            row = self._typvar_rows[offsets[0]]
+            return {"typvar": nomtype, **{col: row[col] for col in columns}}
+
+        except Exception as e:
+            LOGGER.warning(f"Error getting typvar metadata for {nomtype}: {str(e)}")
+            return None
+
+
+def _first_valid(offsets: List[int], rows: List[Dict[str, Any]], as_of: str) -> int:
+    """Binary search the position of the first of offsets, ordered by date with the most
+    recent first, whose row is dated on or before as_of. Rows without a date are always valid."""
+    low, high = 0, len(offsets)
+    while low < high:
+        middle = (low + high) // 2
+        if (rows[offsets[middle]]["date"] or "") > as_of:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _source_signature(dict_file: Path) -> Optional[Tuple[str, int, int]]:
+    """Get the resolved path, modification time and size of a dictionary file."""
+    try:
+        stat = dict_file.stat()
+        return str(dict_file.resolve()), stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _decode_ip_value(ip: Optional[Union[str, int, float]]) -> Optional[float]:
+    """Decode an IP value to its real value for comparisons.
+
+    Integer values (or strings holding integers) are decoded with :func:`convert_ip`,
+    other numbers are considered to already be real values.
+
+    Args:
+        ip (Optional[Union[str, int, float]]): The IP value.
+
+    Returns:
+        Optional[float]: The decoded value, None if ip is empty or not a number.
+    """
+    if ip is None or (isinstance(ip, str) and not ip.strip()):
+        return None
+    try:
+        val = float(ip)
+        if val.is_integer():
+            # Get just the p value from convert_ip
+            _, p, _ = _convert_ip(int(val), 0, 0, -1)  # Decode mode
+            return p
+        return val
+    except (ValueError, TypeError):
+        return None
@@ -0,0 +1,94 @@
+"""Polars expression namespace for the conversion of IP values.
+
+Importing this module registers the ``cmcdict`` namespace on Polars expressions. It is
+not imported by cmcdict, whatever the import order, import it explicitly:
+
+    >>> import cmcdict.expressions
+    >>> frame.with_columns(
+    ...     level=pl.col("ip1").cmcdict.decode_ip(),
+    ...     kind=pl.col("ip1").cmcdict.level_kind(),
+    ... )
+    >>> frame.with_columns(ip1=pl.col("level").cmcdict.encode_ip(Kind.PRESSURE))
+
+The conversions run over whole columns with :func:`cmcdict.convert_ip_array`, without
+calling back into Python for each row, and give the same results as :func:`cmcdict.convert_ip`.
+IP columns can hold integers or strings of integers, as the IP columns of the dictionary.
+Missing values, and values that cannot be converted, are null.
+"""
+
+from typing import Union
+
+import polars as pl
+
+from .ip import convert_ip_array
+
+
+def _ip_values(series: pl.Series) -> pl.Series:
+    """Get the IP values of a series of integers or strings, null where missing or invalid."""
+    if series.dtype == pl.Utf8 or isinstance(series.dtype, (pl.Categorical, pl.Enum)):
+        series = series.cast(pl.Utf8).str.strip_chars()
+    return series.cast(pl.Int64, strict=False)
+
+
+def _decode(series: pl.Series, kinds: bool) -> pl.Series:
+    """Decode a series of IP values to their levels, or to their kinds if kinds is True."""
+    ips = _ip_values(series)
+    _, levels, level_kinds = convert_ip_array(ips.fill_null(0).to_numpy(), 0, 0, -1)
+    if kinds:
+        result = pl.Series(series.name, level_kinds, dtype=pl.Int8)
+    else:
+        result = pl.Series(series.name, levels, dtype=pl.Float64)
+    return result.set(ips.is_null() | pl.Series(level_kinds < 0), None)
+
+
+def _encode(frame: pl.Series) -> pl.Series:
+    """Encode a struct series of levels and kinds to IP values."""
+    levels = frame.struct.field("level").cast(pl.Float64, strict=False)
+    kinds = frame.struct.field("kind").cast(pl.Int64, strict=False)
+    ips, _, ip_kinds = convert_ip_array(0, levels.fill_null(0.0).to_numpy(), kinds.fill_null(-1).to_numpy(), 1)
+    result = pl.Series(frame.name, ips, dtype=pl.Int64)
+    return result.set(levels.is_null() | kinds.is_null() | pl.Series(ip_kinds < 0), None)
+
+
+@pl.api.register_expr_namespace("cmcdict")
+class IPNamespace:
+    """Conversions of IP values, see :func:`cmcdict.convert_ip`."""
+
+    def __init__(self, expr: pl.Expr):
+        self._expr = expr
+
+    def decode_ip(self) -> pl.Expr:
+        """Decode IP values to the real values of their levels.
+
+        Returns:
+            pl.Expr: Float64 expression of the levels
+        """
+        return self._expr.map_batches(lambda series: _decode(series, False), pl.Float64, is_elementwise=True)
+
+    def level_kind(self) -> pl.Expr:
+        """Decode IP values to the kinds of their levels.
+
+        Returns:
+            pl.Expr: Int8 expression of the kinds, see :class:`cmcdict.Kind`
+        """
+        return self._expr.map_batches(lambda series: _decode(series, True), pl.Int8, is_elementwise=True)
+
+    def encode_ip(self, kind: Union[int, str, pl.Expr]) -> pl.Expr:
+        """Encode real level values to IP values.
+
+        Args:
+            kind (Union[int, str, pl.Expr]): Kind of the levels (see :class:`cmcdict.Kind`), or
+                column name or expression of the kind of each level
+
+        Returns:
+            pl.Expr: Int64 expression of the IP values, null where the level cannot be encoded
+        """
+        if isinstance(kind, str):
+            kind = pl.col(kind)
+        elif not isinstance(kind, pl.Expr):
+            kind = pl.lit(int(kind), dtype=pl.Int64)
+        return (
+            pl.struct(level=self._expr, kind=kind)
+            .map_batches(_encode, pl.Int64, is_elementwise=True)
+            .alias(self._expr.meta.output_name(raise_if_undetermined=False) or "ip")
+        )
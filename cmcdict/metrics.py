@@ -0,0 +1,139 @@
+"""Optional instrumentation of the dictionary loading and of the lookups.
+
+The phases of each dictionary load (discover, parse, process, frame build, ...) are
+always timed, loading happens once per process and its cost is negligible.
+
+Lookup counters and latency histograms are only recorded once enabled with
+:func:`cmcdict.enable_stats`. When disabled, the public lookup functions only check
+:data:`ENABLED` before running, nothing is timed or counted, and :func:`cmcdict.convert_ip`
+is bound to the original function.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+# Set by cmcdict.enable_stats, checked by the instrumented functions
+ENABLED = False
+
+# Upper bounds in seconds of the latency histogram buckets, a last bucket holds slower calls
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 1e-2, 1e-1)
+
+_lock = threading.Lock()
+_load_phases: Dict[str, float] = {}
+_apis: Dict[str, "ApiStats"] = {}
+
+
+class ApiStats:
+    """Counters and latency histogram of a public function.
+
+    Attributes:
+        calls (int): Number of calls
+        hits (int): Number of calls that returned a result
+        misses (int): Number of calls that returned None
+        errors (int): Number of calls that raised an exception
+        total_time (float): Total time spent in the calls, in seconds
+        histogram (List[int]): Number of calls per latency bucket, see LATENCY_BUCKETS
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def record(self, elapsed: float, found: bool, error: bool = False) -> None:
+        self.calls += 1
+        if error:
+            self.errors += 1
+        elif found:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.total_time += elapsed
+        self.histogram[bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        bounds = list(LATENCY_BUCKETS) + [float("inf")]
+        return {
+            "calls": self.calls,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "total_time": self.total_time,
+            "mean_time": self.total_time / self.calls if self.calls else 0.0,
+            "histogram": dict(zip(bounds, self.histogram)),
+        }
+
+
+def measure(api: str, func: Callable[..., Any], *args: Any) -> Any:
+    """Call func and record its latency and result in the statistics of api.
+
+    Args:
+        api (str): Name of the public function being measured
+        func (Callable[..., Any]): The function to call
+        *args (Any): Arguments of func
+
+    Returns:
+        Any: The result of func, calls returning None are counted as misses.
+    """
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+    except Exception:
+        _record(api, time.perf_counter() - start, False, error=True)
+        raise
+    _record(api, time.perf_counter() - start, result is not None)
+    return result
+
+
+def _record(api: str, elapsed: float, found: bool, error: bool = False) -> None:
+    with _lock:
+        stats = _apis.get(api)
+        if stats is None:
+            stats = _apis[api] = ApiStats()
+        stats.record(elapsed, found, error)
+
+
+def start_load() -> None:
+    """Forget the phase timings of the previous dictionary load."""
+    with _lock:
+        _load_phases.clear()
+
+
+def record_phase(phase: str, elapsed: float) -> None:
+    """Add elapsed seconds to a phase of the current dictionary load."""
+    with _lock:
+        _load_phases[phase] = _load_phases.get(phase, 0.0) + elapsed
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time the enclosed block as a phase of the current dictionary load."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def load_phases() -> Dict[str, float]:
+    """Get the phase timings of the last dictionary load, in seconds."""
+    with _lock:
+        return dict(_load_phases)
+
+
+def api_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the counters and latency histograms of the measured functions."""
+    with _lock:
+        return {api: stats.as_dict() for api, stats in _apis.items()}
+
+
+def reset() -> None:
+    """Reset the counters and latency histograms of the measured functions."""
+    with _lock:
+        _apis.clear()
@@ -0,0 +1,182 @@
+"""Full-text search of the metvars by nomvar and description.
+
+An inverted index maps each term of the nomvars and of the short and long descriptions
+to the metvars containing it, separately for the English and French descriptions. Terms
+are lowercased and accents are removed, so "Précipitation" and "precipitation" match.
+
+The index is built on the first search and kept for the lifetime of the dictionary.
+A query matches the metvars containing all its terms, the last term of a query also
+matches as a prefix. Results are ranked by the sum over the query terms of the inverse
+document frequency of the term, weighted by the field it was found in and the length of
+that field. Ties are broken by the length of the short description, then of the nomvar,
+so that the most specific and most basic variables come first.
+"""
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+LANGUAGES = ("en", "fr")
+
+# Weight of a term found in each field, a nomvar match ranks first
+FIELD_WEIGHTS = {"nomvar": 3.0, "description_short": 2.0, "description_long": 1.0}
+
+# Score factor of terms matched as a prefix of the query term
+PREFIX_FACTOR = 0.5
+
+# Shortest query term also matched as a prefix
+MIN_PREFIX_LENGTH = 3
+
+_WORD = re.compile(r"\w+")
+
+
+class SearchResult(NamedTuple):
+    """A metvar matching a search query.
+
+    Attributes:
+        nomvar (str): The matching nomvar
+        score (float): Relevance of the match, higher is better
+        description (str): Short description of the metvar in the language of the search
+    """
+
+    nomvar: str
+    score: float
+    description: str
+
+
+def fold(text: str) -> str:
+    """Lowercase text and remove its accents."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text in folded terms, see :func:`fold`."""
+    return _WORD.findall(fold(text)) if text else []
+
+
+class SearchIndex:
+    """Inverted index of the nomvars and descriptions of the metvar rows.
+
+    Args:
+        rows (List[Dict[str, Any]]): The metvar rows, documents are identified by their offset
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self._rows = rows
+        self._postings = {lang: {} for lang in LANGUAGES}
+        for offset, row in enumerate(rows):
+            for lang, postings in self._postings.items():
+                for field, field_weight in FIELD_WEIGHTS.items():
+                    terms = tokenize(row["nomvar"] if field == "nomvar" else row[f"{field}_{lang}"])
+                    if not terms:
+                        continue
+                    # Terms of shorter fields are more significant
+                    weight = field_weight / math.sqrt(len(terms))
+                    for term in terms:
+                        documents = postings.setdefault(term, {})
+                        if documents.get(offset, 0.0) < weight:
+                            documents[offset] = weight
+        self._terms = {lang: sorted(postings) for lang, postings in self._postings.items()}
+
+    def _expand(self, lang: str, term: str, prefix: bool) -> Iterable[str]:
+        """Get the indexed terms matching term, itself first, then those it prefixes."""
+        if term in self._postings[lang]:
+            yield term
+        if prefix and len(term) >= MIN_PREFIX_LENGTH:
+            terms = self._terms[lang]
+            for index in range(bisect_left(terms, term), len(terms)):
+                if not terms[index].startswith(term):
+                    break
+                if terms[index] != term:
+                    yield terms[index]
+
+    def _score(self, lang: str, terms: List[str]) -> Dict[int, float]:
+        """Score the documents containing all the terms in lang."""
+        postings = self._postings[lang]
+        count = len(self._rows)
+        scores = None
+        for position, term in enumerate(terms):
+            matched = {}
+            for indexed in self._expand(lang, term, position == len(terms) - 1):
+                factor = 1.0 if indexed == term else PREFIX_FACTOR
+                for offset, weight in postings[indexed].items():
+                    if weight * factor > matched.get(offset, 0.0):
+                        matched[offset] = weight * factor
+            if matched:
+                # Inverse frequency of the documents matching the term or the words it prefixes
+                idf = math.log(1.0 + count / len(matched))
+                matched = {offset: idf * weight for offset, weight in matched.items()}
+            if scores is None:
+                scores = matched
+            else:
+                scores = {offset: scores[offset] + score for offset, score in matched.items() if offset in scores}
+            if not scores:
+                break
+        return scores or {}
+
+    def search(
+        self, query: str, lang: Optional[str] = None, limit: Optional[int] = 10, usages: Optional[List[str]] = None
+    ) -> List[SearchResult]:
+        """Search the metvars matching query, see :func:`cmcdict.search`."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        best = {}
+        for search_lang in LANGUAGES if lang is None else (lang,):
+            for offset, score in self._score(search_lang, terms).items():
+                row = self._rows[offset]
+                if usages and row["usage"] and row["usage"] not in usages:
+                    continue
+                nomvar = row["nomvar"]
+                if nomvar not in best or score > best[nomvar][0]:
+                    best[nomvar] = (score, row[f"description_short_{lang or 'en'}"])
+
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], len(item[1][1]), len(item[0]), item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [SearchResult(nomvar, score, description) for nomvar, (score, description) in ranked]
+
+
+def search(
+    query: str, lang: Optional[str] = None, limit: Optional[int] = 10, usages: Optional[List[str]] = None
+) -> List[SearchResult]:
+    """Search the metvars by nomvar and description.
+
+    Args:
+        query (str): Words to search, accents and case are ignored. All the words must match,
+            the last one also matches as a prefix.
+        lang (Optional[str]): Search the "en" or "fr" descriptions, or both if None (default: None)
+        limit (Optional[int]): Maximum number of results, all the results if None (default: 10)
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+
+    Returns:
+        List[SearchResult]: The matching nomvars, most relevant first
+
+    Raises:
+        TypeError: If query is not a string
+        ValueError: If lang, limit or usages is invalid
+
+    Example:
+        >>> [result.nomvar for result in search('cloud mask', limit=3)]
+        ['CM2', 'CCM', 'CM4']
+    """
+    from . import _check_usages, _get_dictionary
+
+    if not isinstance(query, str):
+        raise TypeError("query must be a string")
+    if lang is not None and lang not in LANGUAGES:
+        raise ValueError(f"lang must be None or one of {', '.join(LANGUAGES)}")
+    if limit is not None and (not isinstance(limit, int) or limit < 1):
+        raise ValueError("limit must be a positive integer or None")
+    if usages is None:
+        usages = ["current"]
+    _check_usages(usages)
+
+    index = _get_dictionary().get_search_index()
+    if index is None:
+        return []
+    return index.search(query, lang, limit, usages)
@@ -0,0 +1,237 @@
+"""Persistent snapshot of the parsed operational dictionary.
+
+Parsing the XML dictionary and building the metvar/typvar DataFrames is by far the
+most expensive part of loading cmcdict. This module stores the built DataFrames as
+uncompressed Arrow IPC files in a user cache directory so that later processes can
+memory-map them instead of parsing the XML again.
+
+Snapshots are keyed by the resolved path, modification time, size and content hash
+of the source XML file, so any change to the dictionary produces a new snapshot.
+
+The same files are used to share a loaded dictionary with worker processes: the
+parent exports its DataFrames with :func:`export_frames` and the workers memory-map
+them with :func:`read_frames`, so the pages are shared by all the processes.
+
+Environment variables:
+    CMCDICT_CACHE_DIR: Directory where snapshots are stored
+        (default: ``$XDG_CACHE_HOME/cmcdict`` or ``~/.cache/cmcdict``).
+    CMCDICT_DISABLE_SNAPSHOT: Set to a non empty value to disable snapshots.
+    CMCDICT_SHARED_DICTIONARY: Directory of exported DataFrames to load instead of
+        the operational dictionary, set by :func:`cmcdict.export_shared`.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+import polars as pl
+
+LOGGER = logging.getLogger(__name__)
+
+# Increment when the layout of the cached DataFrames changes
+SNAPSHOT_FORMAT = 6
+
+SHARED_DICTIONARY_ENV = "CMCDICT_SHARED_DICTIONARY"
+
+
+def snapshot_dir() -> Optional[Path]:
+    """Get the directory where snapshots are stored.
+
+    Returns:
+        Optional[Path]: The snapshot directory, or None if snapshots are disabled.
+    """
+    if os.environ.get("CMCDICT_DISABLE_SNAPSHOT"):
+        return None
+
+    if os.environ.get("CMCDICT_CACHE_DIR"):
+        return Path(os.environ["CMCDICT_CACHE_DIR"])
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return Path(cache_home) / "cmcdict"
+
+
+def _source_id(dict_file: Path) -> str:
+    """Get a short identifier for the location of a dictionary file."""
+    return hashlib.sha256(str(dict_file.resolve()).encode("utf-8")).hexdigest()[:16]
+
+
+def snapshot_key(dict_file: Path) -> str:
+    """Compute the snapshot key of a dictionary file.
+
+    Args:
+        dict_file (Path): Path to the XML dictionary file.
+
+    Returns:
+        str: Key made of the source identifier followed by a hash of the file's
+            path, modification time, size, content and of the snapshot format.
+    """
+    stat = dict_file.stat()
+    content_hash = hashlib.sha256(dict_file.read_bytes()).hexdigest()
+    fingerprint = "|".join(
+        [
+            str(dict_file.resolve()),
+            str(stat.st_mtime_ns),
+            str(stat.st_size),
+            content_hash,
+            str(SNAPSHOT_FORMAT),
+            pl.__version__,
+        ]
+    )
+    return f"{_source_id(dict_file)}-{hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:32]}"
+
+
+def _snapshot_paths(directory: Path, key: str) -> Tuple[Path, Path]:
+    return directory / f"{key}.metvar.arrow", directory / f"{key}.typvar.arrow"
+
+
+def load_snapshot(dict_file: Path) -> Optional[Tuple[pl.DataFrame, pl.DataFrame]]:
+    """Load the snapshot of a dictionary file if one exists.
+
+    Args:
+        dict_file (Path): Path to the XML dictionary file.
+
+    Returns:
+        Optional[Tuple[pl.DataFrame, pl.DataFrame]]: The memory-mapped metvar and typvar
+            DataFrames, or None if there is no valid snapshot.
+    """
+    directory = snapshot_dir()
+    if directory is None:
+        return None
+
+    try:
+        metvar_path, typvar_path = _snapshot_paths(directory, snapshot_key(dict_file))
+        if not (metvar_path.exists() and typvar_path.exists()):
+            return None
+
+        metvar_df = pl.read_ipc(metvar_path, memory_map=True)
+        typvar_df = pl.read_ipc(typvar_path, memory_map=True)
+        LOGGER.info(f"Loaded dictionary snapshot {metvar_path}")
+        return metvar_df, typvar_df
+
+    except Exception as e:
+        LOGGER.warning(f"Error loading dictionary snapshot: {str(e)}")
+        return None
+
+
+def _write_atomic(df: pl.DataFrame, path: Path) -> None:
+    """Write a DataFrame to an IPC file so that readers never see a partial file."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            df.write_ipc(f, compression="uncompressed")
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def save_snapshot(dict_file: Path, metvar_df: pl.DataFrame, typvar_df: pl.DataFrame) -> Optional[Path]:
+    """Save the built DataFrames of a dictionary file to a snapshot.
+
+    Older snapshots of the same dictionary file are removed.
+
+    Args:
+        dict_file (Path): Path to the XML dictionary file the DataFrames were built from.
+        metvar_df (pl.DataFrame): The metvar DataFrame.
+        typvar_df (pl.DataFrame): The typvar DataFrame.
+
+    Returns:
+        Optional[Path]: Path of the metvar snapshot file, or None if it was not written.
+    """
+    directory = snapshot_dir()
+    if directory is None:
+        return None
+
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        key = snapshot_key(dict_file)
+        metvar_path, typvar_path = _snapshot_paths(directory, key)
+
+        # The metvar file is written last, its presence marks a complete snapshot
+        _write_atomic(typvar_df, typvar_path)
+        _write_atomic(metvar_df, metvar_path)
+
+        for path in directory.glob(f"{_source_id(dict_file)}-*.arrow"):
+            if not path.name.startswith(key):
+                path.unlink(missing_ok=True)
+
+        LOGGER.info(f"Saved dictionary snapshot {metvar_path}")
+        return metvar_path
+
+    except Exception as e:
+        LOGGER.warning(f"Error saving dictionary snapshot: {str(e)}")
+        return None
+
+
+def export_frames(
+    directory: Path, metvar_df: pl.DataFrame, typvar_df: pl.DataFrame, source: Optional[Tuple[str, int, int]] = None
+) -> Path:
+    """Export DataFrames to IPC files that other processes can memory-map.
+
+    Args:
+        directory (Path): Directory where the files are written, created if needed.
+        metvar_df (pl.DataFrame): The metvar DataFrame.
+        typvar_df (pl.DataFrame): The typvar DataFrame.
+        source (Optional[Tuple[str, int, int]]): Path, modification time and size of the dictionary file
+            the DataFrames were loaded from, see :func:`read_source`.
+
+    Returns:
+        Path: The directory holding the exported files.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    metvar_path, typvar_path = _snapshot_paths(directory, "shared")
+    source_path = directory / "shared.source.json"
+    fd, tmp_name = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(list(source) if source is not None else None, f)
+    os.replace(tmp_name, source_path)
+    _write_atomic(typvar_df, typvar_path)
+    _write_atomic(metvar_df, metvar_path)
+    return directory
+
+
+def read_frames(directory: Path) -> Optional[Tuple[pl.DataFrame, pl.DataFrame]]:
+    """Memory-map DataFrames exported with :func:`export_frames`.
+
+    Args:
+        directory (Path): Directory holding the exported files.
+
+    Returns:
+        Optional[Tuple[pl.DataFrame, pl.DataFrame]]: The memory-mapped metvar and typvar
+            DataFrames, or None if they could not be read.
+    """
+    try:
+        metvar_path, typvar_path = _snapshot_paths(directory, "shared")
+        metvar_df = pl.read_ipc(metvar_path, memory_map=True)
+        typvar_df = pl.read_ipc(typvar_path, memory_map=True)
+        LOGGER.info(f"Attached to shared dictionary {directory}")
+        return metvar_df, typvar_df
+
+    except Exception as e:
+        LOGGER.warning(f"Error reading shared dictionary: {str(e)}")
+        return None
+
+
+def read_source(directory: Path) -> Optional[Tuple[str, int, int]]:
+    """Get the source of DataFrames exported with :func:`export_frames`.
+
+    Args:
+        directory (Path): Directory holding the exported files.
+
+    Returns:
+        Optional[Tuple[str, int, int]]: Path, modification time and size of the dictionary
+            file the exported DataFrames were loaded from, or None if it is unknown.
+    """
+    try:
+        with open(directory / "shared.source.json", encoding="utf-8") as f:
+            source = json.load(f)
+        return tuple(source) if source is not None else None
+
+    except Exception as e:
+        LOGGER.warning(f"Error reading shared dictionary source: {str(e)}")
+        return None
@@ -0,0 +1,156 @@
+"""Annotation of record streams with the metadata of the dictionary.
+
+Inventories of RPN standard files produce far more records than can be held in
+memory. :func:`annotate_stream` pulls the records of an iterable in chunks, resolves
+each chunk at once with the batch lookup of :func:`cmcdict.get_metvar_metadata_frame`,
+then yields the annotated records of the chunk before pulling the next one. Only one
+chunk is held in memory at a time and the cost of a chunk does not depend on the size
+of the inventory.
+"""
+
+from collections import abc
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    import polars as pl
+
+    from .dictionary import CMCDictionary
+
+# Fields of the records, in the order of the record sequences
+RECORD_FIELDS = ("nomvar", "typvar", "ip1", "ip2", "ip3")
+
+DEFAULT_CHUNK_SIZE = 10000
+
+OUTPUTS = ("records", "frames", "arrow")
+
+
+def _record_fields(record: Union[Sequence[Any], Mapping[str, Any]]) -> Tuple[Any, ...]:
+    """Get the RECORD_FIELDS of a record sequence or mapping, None when missing."""
+    if type(record) is tuple and len(record) == 5:
+        return record
+    if isinstance(record, abc.Mapping):
+        return tuple(record.get(field) for field in RECORD_FIELDS)
+    if isinstance(record, str) or not isinstance(record, abc.Sequence):
+        raise TypeError("records must be sequences of (nomvar, typvar, ip1, ip2, ip3) or mappings")
+    return tuple(record[:5]) + (None,) * (5 - len(record))
+
+
+def _annotate_chunk(
+    dictionary: "CMCDictionary",
+    chunk: List[Tuple[Any, ...]],
+    columns: List[str],
+    usages: List[str],
+    typvar_columns: Optional[List[str]],
+) -> "pl.DataFrame":
+    """Resolve the metadata of a chunk of record fields, aligned with the chunk."""
+    import polars as pl
+
+    fields = pl.DataFrame(
+        {
+            field: [value if value is None or type(value) is str else str(value) for value in values]
+            for field, values in zip(RECORD_FIELDS, zip(*chunk))
+        },
+        schema={field: pl.Utf8 for field in RECORD_FIELDS},
+    )
+    metadata = dictionary.get_metvar_frame(fields.select("nomvar", "ip1", "ip3"), columns, usages)
+
+    if typvar_columns:
+        # Each distinct typvar of the chunk is resolved once
+        typvars = {typvar: dictionary.get_typvar(typvar, typvar_columns) for typvar in set(fields["typvar"])}
+        metadata = metadata.hstack(
+            [
+                pl.Series(
+                    f"typvar_{col}",
+                    [None if typvars[typvar] is None else typvars[typvar][col] for typvar in fields["typvar"]],
+                    dtype=pl.Utf8,
+                )
+                for col in typvar_columns
+            ]
+        )
+    return fields.hstack(metadata.get_columns())
+
+
+def _annotate(
+    records: Iterable[Union[Sequence[Any], Mapping[str, Any]]],
+    columns: List[str],
+    chunk_size: int,
+    usages: List[str],
+    typvar_columns: Optional[List[str]],
+    output: str,
+) -> Iterator[Any]:
+    from . import _get_dictionary
+
+    iterator = iter(records)
+    while True:
+        chunk = [_record_fields(record) for record in islice(iterator, chunk_size)]
+        if not chunk:
+            return
+
+        # The dictionary is fetched per chunk so that long streams pick up reloads
+        frame = _annotate_chunk(_get_dictionary(), chunk, columns, usages, typvar_columns)
+        if output == "frames":
+            yield frame
+        elif output == "arrow":
+            yield from frame.to_arrow().to_batches()
+        else:
+            names = frame.columns[len(RECORD_FIELDS) :]
+            for record, values in zip(chunk, frame.select(names).iter_rows()):
+                yield {**dict(zip(RECORD_FIELDS, record)), **dict(zip(names, values))}
+
+
+def annotate_stream(
+    records: Iterable[Union[Sequence[Any], Mapping[str, Any]]],
+    columns: Optional[List[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    usages: Optional[List[str]] = None,
+    typvar_columns: Optional[List[str]] = None,
+    output: str = "records",
+) -> Iterator[Union[Dict[str, Any], "pl.DataFrame", Any]]:
+    """Annotate a stream of records with the metadata of their metvars and typvars.
+
+    Records are pulled chunk_size at a time, each chunk is resolved at once with the rules of
+    :func:`cmcdict.get_metvar_metadata_frame` before its records are yielded, so the memory used
+    is bounded by the chunk size whatever the length of the stream.
+
+    Args:
+        records (Iterable[Union[Sequence[Any], Mapping[str, Any]]]): The records, as
+            (nomvar, typvar, ip1, ip2, ip3) sequences or as mappings with these keys.
+            Missing trailing fields or keys are None.
+        columns (Optional[List[str]]): List of metvar columns to add. If None, adds all available columns.
+        chunk_size (int): Number of records resolved at once (default: 10000)
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+        typvar_columns (Optional[List[str]]): List of typvar columns to add, prefixed with "typvar_"
+            (default: None, no typvar columns)
+        output (str): "records" to yield a dictionary per record, "frames" to yield a Polars
+            DataFrame per chunk or "arrow" to yield Arrow record batches, which requires pyarrow
+            (default: "records")
+
+    Returns:
+        Iterator[Union[Dict[str, Any], pl.DataFrame, pyarrow.RecordBatch]]: The annotated records
+            in input order, with the record fields followed by the requested columns. Columns are
+            None for records that are not found or that match several IP definitions.
+
+    Raises:
+        ValueError: If columns, typvar_columns, usages, chunk_size or output is invalid
+        TypeError: If a record is neither a sequence nor a mapping, when it is pulled
+
+    Example:
+        >>> records = ((nomvar, typvar, ip1, ip2, ip3) for nomvar, typvar, ip1, ip2, ip3 in inventory)
+        >>> for record in annotate_stream(records, columns=['units']):
+        ...     print(record['nomvar'], record['units'])
+    """
+    from . import _check_metvar_columns, _check_typvar_columns, _check_usages
+
+    columns = _check_metvar_columns(columns)
+    if typvar_columns is not None:
+        typvar_columns = _check_typvar_columns(typvar_columns)
+    if usages is None:
+        usages = ["current"]
+    _check_usages(usages)
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+    if output not in OUTPUTS:
+        raise ValueError(f"output must be one of {', '.join(OUTPUTS)}")
+
+    return _annotate(records, columns, chunk_size, usages, typvar_columns, output)
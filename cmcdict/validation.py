@@ -0,0 +1,157 @@
+"""Validation of data arrays against the min and max attributes of the dictionary.
+
+The bounds of each metvar are parsed once when the dictionary is loaded, see the
+``min_value`` and ``max_value`` columns. The arrays are compared to them with NumPy
+comparisons over the whole array: the input is never copied, only boolean arrays of
+its shape are allocated for the comparisons. NaN values are never out of range.
+"""
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class RangeCheck(NamedTuple):
+    """Result of the validation of an array against the bounds of a metvar.
+
+    Attributes:
+        nomvar (str): The validated nomvar
+        min (Optional[float]): Lower bound of the dictionary, None when not defined
+        max (Optional[float]): Upper bound of the dictionary, None when not defined
+        size (int): Number of values checked
+        below (int): Number of values lower than min
+        above (int): Number of values greater than max
+        mask (Optional[np.ndarray]): Boolean array of the shape of the input, True where
+            the value is out of range, only when requested
+    """
+
+    nomvar: str
+    min: Optional[float]
+    max: Optional[float]
+    size: int
+    below: int
+    above: int
+    mask: Optional["np.ndarray"] = None
+
+    @property
+    def out_of_range(self) -> int:
+        """Number of values lower than min or greater than max."""
+        return self.below + self.above
+
+
+def _check_array(array: Any, bounds: Tuple[Optional[float], Optional[float]], nomvar: str, mask: bool) -> RangeCheck:
+    """Compare the values of array to bounds, without copying array."""
+    import numpy as np
+
+    values = np.asarray(array)
+    if values.dtype.kind not in "biuf":
+        raise TypeError(f"array of {nomvar} must be numeric, got {values.dtype}")
+
+    minimum, maximum = bounds
+    below_mask = np.less(values, minimum) if minimum is not None else None
+    above_mask = np.greater(values, maximum) if maximum is not None else None
+    below = int(np.count_nonzero(below_mask)) if below_mask is not None else 0
+    above = int(np.count_nonzero(above_mask)) if above_mask is not None else 0
+
+    out_mask = None
+    if mask:
+        if below_mask is None and above_mask is None:
+            out_mask = np.zeros(values.shape, dtype=bool)
+        elif below_mask is None or above_mask is None:
+            out_mask = below_mask if above_mask is None else above_mask
+        else:
+            out_mask = np.logical_or(below_mask, above_mask, out=below_mask)
+
+    return RangeCheck(nomvar, minimum, maximum, int(values.size), below, above, out_mask)
+
+
+def validate_ranges(
+    nomvar: str,
+    array: Union["np.ndarray", Any],
+    ip1: Optional[Union[str, int]] = None,
+    ip3: Optional[Union[str, int]] = None,
+    usages: Optional[List[str]] = None,
+    mask: bool = False,
+) -> Optional[RangeCheck]:
+    """Count the values of an array outside of the min and max of a metvar.
+
+    Args:
+        nomvar (str): The nomvar of the field
+        array (Union[np.ndarray, Any]): The values of the field, of any shape and numeric dtype
+        ip1 (Optional[Union[str, int]]): IP1 of the field, for the variables defined per IP1 value
+        ip3 (Optional[Union[str, int]]): IP3 of the field, for the variables defined per IP3 value
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+        mask (bool): Also return a boolean mask of the out of range values (default: False)
+
+    Returns:
+        Optional[RangeCheck]: The bounds and the counts of values below and above them, or None
+            if the nomvar is not found. Values are never out of a bound that is not defined.
+
+    Raises:
+        TypeError: If nomvar is not a string or array is not numeric
+        ValueError: If usages is invalid
+        MultipleDefinitionsException: If the nomvar is defined per IP value with different
+            bounds and no IP value was given
+
+    Example:
+        >>> check = validate_ranges('ALRD', np.array([0.2, 1.5, -0.1]))
+        >>> check.below, check.above
+        (1, 1)
+    """
+    return validate_ranges_batch([(nomvar, array)], ip1=ip1, ip3=ip3, usages=usages, mask=mask)[0]
+
+
+def validate_ranges_batch(
+    fields: Union[Mapping, Iterable[Tuple[str, Any]]],
+    ip1: Optional[Union[str, int]] = None,
+    ip3: Optional[Union[str, int]] = None,
+    usages: Optional[List[str]] = None,
+    mask: bool = False,
+) -> List[Optional[RangeCheck]]:
+    """Count the values of many arrays outside of the min and max of their metvar.
+
+    The bounds of each distinct nomvar are resolved once.
+
+    Args:
+        fields (Union[Mapping, Iterable[Tuple[str, Any]]]): Mapping of nomvars to arrays, or
+            iterable of (nomvar, array) pairs, for example the fields of a model output
+        ip1 (Optional[Union[str, int]]): IP1 of all the fields, see :func:`validate_ranges`
+        ip3 (Optional[Union[str, int]]): IP3 of all the fields, see :func:`validate_ranges`
+        usages (Optional[List[str]]): List of usages to consider (default: ["current"])
+        mask (bool): Also return boolean masks of the out of range values (default: False)
+
+    Returns:
+        List[Optional[RangeCheck]]: One result per field in input order, None for the
+            nomvars that are not found
+
+    Raises:
+        TypeError: If a nomvar is not a string or an array is not numeric
+        ValueError: If usages is invalid
+        MultipleDefinitionsException: If a nomvar is defined per IP value with different
+            bounds and no IP value was given
+    """
+    from . import _check_usages, _get_dictionary
+    from .dictionary import _decode_ip_value
+
+    if usages is None:
+        usages = ["current"]
+    _check_usages(usages)
+
+    dictionary = _get_dictionary()
+    ip1_p = _decode_ip_value(ip1)
+    ip3_p = _decode_ip_value(ip3)
+
+    bounds = {}
+    results = []
+    for nomvar, array in fields.items() if isinstance(fields, Mapping) else fields:
+        if not isinstance(nomvar, str):
+            raise TypeError("nomvar must be a string")
+        if nomvar not in bounds:
+            bounds[nomvar] = dictionary.get_metvar_bounds(nomvar, usages, ip1_p, ip3_p)
+        if bounds[nomvar] is None:
+            results.append(None)
+        else:
+            results.append(_check_array(array, bounds[nomvar], nomvar, mask))
+    return results
@@ -1,7 +1,11 @@
 # -*- coding: utf-8 -*-
+import polars as pl
 import pytest
 import cmcdict
+import datetime
 import os
+import subprocess
+import sys
 
 pytestmark = [pytest.mark.unit_tests]
 
@@ -583,3 +587,335 @@ def test_50():
     large_unique_result = cmcdict.get_metvar_metadata(unique_vars, columns=["description_short_en"])
     assert len(large_unique_result) == 100  # Each variable should be present in result
     assert all(var in large_unique_result for var in unique_vars)  # All variables should be in result
+
+
+def test_51():
+    """test that importing cmcdict does not load the dictionary until first lookup"""
+    code = (
+        "import cmcdict\n"
+        "assert cmcdict.CMCDictionary._instance is None\n"
+        "cmcdict.preload()\n"
+        "assert cmcdict.CMCDictionary._instance is not None\n"
+        "assert cmcdict.get_metvar_metadata('TT', columns=['units'])['units'] == '°C'\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(TEST_DIR), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_52():
+    """test streaming parser returns column-wise metvar and typvar records"""
+    metvar_columns, typvar_columns = cmcdict._parse_opt_dict(cmcdict._find_ops_variable_dictionary())
+    assert list(metvar_columns) == list(cmcdict.METVAR_SCHEMA)
+    assert list(typvar_columns) == list(cmcdict.TYPVAR_SCHEMA)
+    assert len({len(values) for values in metvar_columns.values()}) == 1
+    assert len({len(values) for values in typvar_columns.values()}) == 1
+    assert "TT" in metvar_columns["nomvar"]
+    assert "R" in typvar_columns["typvar"]
+
+
+def test_53():
+    """test nomvar index rows are ordered most recent definition first"""
+    dictionary = cmcdict._get_dictionary()
+    for nomvar, offsets in dictionary._metvar_index.items():
+        dates = [dictionary._metvar_rows[offset]["date"] for offset in offsets]
+        assert dates == sorted(dates, reverse=True)
+        assert all(dictionary._metvar_rows[offset]["nomvar"] == nomvar for offset in offsets)
+    assert sum(len(offsets) for offsets in dictionary._metvar_index.values()) == dictionary._metvar_df.height
+
+
+def test_54():
+    """test decoded ip1/ip3 values are precomputed when the dictionary is loaded"""
+    dictionary = cmcdict._get_dictionary()
+    assert {"ip1_p", "ip3_p"} <= set(dictionary._metvar_df.columns)
+    _, p, _ = cmcdict.convert_ip(1196, 0, 0, -1)
+    (offset,) = dictionary._ip1_index["UDST"][p]
+    assert dictionary._metvar_rows[offset]["ip1"] == "1196"
+    assert set(dictionary._ip3_index["QO1"]) == {cmcdict.convert_ip(ip, 0, 0, -1)[1] for ip in (0, 10, 20, 30)}
+
+
+def test_55():
+    """test batch metadata frame is aligned with the input records"""
+    result = cmcdict.get_metvar_metadata_frame(
+        ["TT", "UDST", "UDST", "INVALID", "TT"], ip1=[None, 1196, "1195", None, 0], columns=["units"]
+    )
+    assert result.columns == ["nomvar", "ip1", "units"]
+    assert result["nomvar"].to_list() == ["TT", "UDST", "UDST", "INVALID", "TT"]
+    assert result["units"].to_list() == ["°C", "m/s", "m/s", None, "°C"]
+
+    # A single IP value is broadcast with its type
+    result = cmcdict.get_metvar_metadata_frame(["TT", "UDST"], ip1=1196, columns=["units"])
+    assert result.schema["ip1"] == pl.Int64
+    assert result["units"].to_list() == ["°C", "m/s"]
+    assert cmcdict.get_metvar_metadata_frame(["UDST"], ip1="1196", columns=["units"]).schema["ip1"] == pl.Utf8
+
+
+def test_56():
+    """test batch metadata frame matches get_metvar_metadata for DataFrame input"""
+    records = pl.DataFrame({"nomvar": ["QO1", "QO1", "UDST", "QO1"], "ip3": [0, 10, 0, None]})
+    result = cmcdict.get_metvar_metadata_frame(records, columns=["description_short_en", "date"])
+    assert result.columns == ["nomvar", "ip3", "description_short_en", "date"]
+    for row in result.head(3).iter_rows(named=True):
+        expected = cmcdict.get_metvar_metadata(row["nomvar"], columns=["description_short_en", "date"], ip3=row["ip3"])
+        assert row["description_short_en"] == expected["description_short_en"]
+        assert row["date"] == expected["date"]
+    # QO1 has several ip3 definitions and no ip3 was given
+    assert result.row(3, named=True)["description_short_en"] is None
+
+
+def test_57():
+    """test batch metadata frame input validation"""
+    with pytest.raises(TypeError):
+        _ = cmcdict.get_metvar_metadata_frame("TT")
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata_frame(["TT", "UU"], ip1=[0])
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata_frame(pl.DataFrame({"nomvar": ["TT"]}), ip1=0)
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata_frame(pl.DataFrame({"name": ["TT"]}))
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata_frame(["TT"], columns=["nomvar"])
+    with pytest.raises(ValueError, match="units"):
+        _ = cmcdict.get_metvar_metadata_frame(pl.DataFrame({"nomvar": ["TT"], "units": ["K"]}))
+
+
+def test_58():
+    """test repeated metadata lookups are served from the result cache"""
+    cmcdict.cache_clear()
+    first = cmcdict.get_metvar_metadata("TT", columns=["units"])
+    second = cmcdict.get_metvar_metadata("TT", columns=["units"])
+    assert first is second
+    info = cmcdict.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    # Batch results are not cached
+    batch = cmcdict.get_metvar_metadata(["TT", "UU"], columns=["units"])
+    assert batch == cmcdict.get_metvar_metadata(["TT", "UU"], columns=["units"])
+    assert cmcdict.cache_info().currsize == 1
+    batch["TT"]["units"] = "K"
+
+
+def test_59():
+    """test cached metadata results are read-only"""
+    result = cmcdict.get_metvar_metadata("UDST")
+    assert isinstance(result, dict)
+    with pytest.raises(TypeError):
+        result["1196"] = None
+    with pytest.raises(TypeError):
+        result["1196"]["units"] = "K"
+    copy = dict(result)
+    copy["1196"] = None
+    assert cmcdict.get_metvar_metadata("UDST")["1196"] is not None
+
+
+def test_60():
+    """test invalid arguments are rejected even after a cached lookup"""
+    _ = cmcdict.get_metvar_metadata("TT", columns=["units"])
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata("TT", columns=("units",))
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata("TT", columns=["invalid"])
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata("TT", usages=["invalid"])
+
+
+def test_61():
+    """test the result cache size can be changed and disabled"""
+    try:
+        cmcdict.set_cache_size(2)
+        for nomvar in ["TT", "UU", "VV"]:
+            _ = cmcdict.get_metvar_metadata(nomvar)
+        assert cmcdict.cache_info().currsize == 2
+
+        cmcdict.set_cache_size(0)
+        assert cmcdict.get_metvar_metadata("TT") == cmcdict.get_metvar_metadata("TT")
+        assert cmcdict.cache_info().hits == 0
+        with pytest.raises(ValueError):
+            cmcdict.set_cache_size(-1)
+    finally:
+        cmcdict.set_cache_size()
+
+
+def test_62():
+    """test that convert_ip and Kind do not import numpy or polars"""
+    code = (
+        "import sys\n"
+        "import cmcdict\n"
+        "from cmcdict.config import Kind\n"
+        "ip, _, _ = cmcdict.convert_ip(0, 850.0, Kind.PRESSURE, 1)\n"
+        "assert cmcdict.convert_ip(ip, 0, 0, -1)[1:] == (850.0, Kind.PRESSURE)\n"
+        "assert 'numpy' not in sys.modules and 'polars' not in sys.modules\n"
+        "assert cmcdict.get_metvar_metadata('TT', columns=['units'])['units'] == '°C'\n"
+        "assert 'numpy' not in sys.modules\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(TEST_DIR), capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_63():
+    """test low-cardinality columns are stored as enums and returned as strings"""
+    dictionary = cmcdict._get_dictionary()
+    assert isinstance(dictionary._metvar_df.schema["usage"], pl.Enum)
+    assert isinstance(dictionary._metvar_df.schema["units"], pl.Enum)
+    assert isinstance(dictionary._typvar_df.schema["usage"], pl.Enum)
+    # Columns with many distinct values stay strings
+    assert dictionary._metvar_df.schema["codes"] == pl.Utf8
+    assert cmcdict.get_metvar_metadata("TT", columns=["usage", "units"]) == {
+        "nomvar": "TT",
+        "usage": "current",
+        "units": "°C",
+    }
+    result = cmcdict.get_metvar_metadata_frame(["TT"], columns=["usage", "units"])
+    assert result.schema["usage"] == pl.Utf8
+    assert result.schema["units"] == pl.Utf8
+
+
+def test_64():
+    """test repeated strings of the row cache are interned"""
+    rows = cmcdict._get_dictionary()._metvar_rows
+    units = {}
+    for row in rows:
+        units.setdefault(row["units"], []).append(row["units"])
+    assert all(value is values[0] for values in units.values() for value in values)
+
+
+def test_65():
+    """test numeric attributes are stored parsed in typed columns with nulls"""
+    df = cmcdict._get_dictionary()._metvar_df
+    assert df.schema["min_value"] == pl.Float64
+    assert df.schema["magnitude_value"] == pl.Float64
+    assert df.schema["ip1_value"] == pl.Int64
+    for col in ("min", "max", "precision", "magnitude", "ip1", "ip2", "ip3"):
+        missing = df.filter(pl.col(col).str.strip_chars().fill_null("") == "")
+        assert missing[f"{col}_value"].null_count() == missing.height
+        present = df.filter(pl.col(col).str.strip_chars().fill_null("") != "")
+        assert present[f"{col}_value"].null_count() == 0
+        assert present[f"{col}_value"].to_list() == [
+            (float if col not in ("ip1", "ip2", "ip3") else int)(value.strip()) for value in present[col]
+        ]
+
+
+def test_66():
+    """test typed frame lookups return numeric columns, dict lookups keep strings"""
+    result = cmcdict.get_metvar_metadata("UDST", ip1="1196")
+    assert "min_value" not in result
+    assert all(isinstance(result[col], str) for col in ("min", "max", "precision", "magnitude"))
+
+    result = cmcdict.get_metvar_metadata_frame(["TT", "UDST"], columns=["min", "max", "units"], typed=True)
+    assert result.schema["min"] == pl.Float64
+    assert result.schema["max"] == pl.Float64
+    assert result.schema["units"] == pl.Utf8
+    assert result["min"].to_list() == [None, None]
+    result = cmcdict.get_metvar_metadata_frame(["TT"], columns=["min"])
+    assert result.schema["min"] == pl.Utf8
+
+
+def test_67():
+    """test lazy queries over the metvars include all usages and string columns"""
+    lazy = cmcdict.scan_metvars()
+    assert isinstance(lazy, pl.LazyFrame)
+    schema = lazy.collect_schema()
+    assert schema["units"] == pl.Utf8
+    assert schema["min_value"] == pl.Float64
+    assert schema["ip1_value"] == pl.Int64
+    assert "ip1_p" not in schema
+
+    result = (
+        lazy.filter((pl.col("measure_type") == "real") & (pl.col("units") == "K") & (pl.col("usage") == "obsolete"))
+        .select("nomvar")
+        .collect()
+    )
+    assert "TE" in result["nomvar"].to_list()
+    assert lazy.filter(pl.col("units") == "invalid").collect().height == 0
+    assert lazy.select(pl.len()).collect().item() == cmcdict._get_dictionary()._metvar_df.height
+
+
+def test_68():
+    """test lazy queries over the typvars"""
+    result = cmcdict.scan_typvars().filter(pl.col("typvar") == "K").collect()
+    assert result.height == 1
+    assert result["description_short_en"][0] == cmcdict.get_typvar_metadata("K")["description_short_en"]
+    assert result.schema["usage"] == pl.Utf8
+
+
+def test_69():
+    """test lookups of every usage state"""
+    assert cmcdict.get_metvar_metadata("TM", columns=["usage"])["usage"] == "current"
+    assert cmcdict.get_metvar_metadata("TM", columns=["usage"], usages=["obsolete"])["usage"] == "obsolete"
+    assert cmcdict.get_metvar_metadata("BFI", columns=["usage"]) is None
+    assert cmcdict.get_metvar_metadata("BFI", columns=["usage"], usages=["future"])["usage"] == "future"
+    assert cmcdict.get_metvar_metadata("SM", columns=["usage"], usages=["incomplete"])["usage"] == "incomplete"
+    result = cmcdict.get_metvar_metadata(["TM", "BFI", "CDRG"], columns=["usage"], usages=["deprecated", "obsolete"])
+    assert result["TM"]["usage"] == "obsolete"
+    assert result["BFI"] is None
+    assert result["CDRG"]["usage"] == "obsolete"
+
+
+def test_70():
+    """test usage combinations are resolved from the usage partitions"""
+    dictionary = cmcdict._get_dictionary()
+    assert sorted(dictionary._usage_index) == ["current", "deprecated", "future", "incomplete", "obsolete"]
+    everything = cmcdict.__METVAR_USAGES
+    assert dictionary._find_metvar_rows("TM", everything) == dictionary._metvar_index["TM"]
+    assert dictionary._find_metvar_rows("TM", ["current"]) is dictionary._usage_index["current"]["TM"]
+    assert dictionary._find_metvar_rows("TM", ["obsolete", "current"]) is dictionary._find_metvar_rows(
+        "TM", ["current", "obsolete"]
+    )
+    frame = cmcdict.get_metvar_metadata_frame(["TM", "BFI"], columns=["usage"], usages=["future", "obsolete"])
+    assert frame["usage"].to_list() == ["obsolete", "future"]
+
+
+def test_71():
+    """test point in time lookups of metvars"""
+    assert sorted(cmcdict.get_metvar_metadata("QO1", columns=["date"])) == ["0", "10", "20", "30"]
+    result = cmcdict.get_metvar_metadata("QO1", columns=["date"], as_of="2017-01-01")
+    assert sorted(result) == ["0", "10"]
+    assert sorted(cmcdict.get_metvar_metadata("ETAS", columns=["date"], as_of=datetime.date(2020, 1, 1))) == [
+        "0",
+        "66060288",
+    ]
+    assert cmcdict.get_metvar_metadata("CM2", as_of="2024-12-16") is None
+    assert cmcdict.get_metvar_metadata("CM2", columns=["date"], as_of="2024-12-17")["date"] == "2024-12-17"
+    assert cmcdict.get_metvar_metadata("CM2", as_of=datetime.datetime(2025, 1, 1, 12)) == cmcdict.get_metvar_metadata(
+        "CM2"
+    )
+    # Definitions without a date are always valid
+    assert cmcdict.get_metvar_metadata("TT", columns=["date"], as_of="1900-01-01")["date"] == ""
+    result = cmcdict.get_metvar_metadata(["CM2", "TT"], columns=["date"], as_of="2020-01-01")
+    assert result["CM2"] is None
+    assert result["TT"] is not None
+
+
+def test_72():
+    """test point in time lookups of typvars and invalid dates"""
+    assert cmcdict.get_typvar_metadata("H", columns=["date"], as_of="2022-12-19") is None
+    assert cmcdict.get_typvar_metadata("H", columns=["date"], as_of="2022-12-20")["date"] == "2022-12-20"
+    assert cmcdict.get_typvar_metadata("K", as_of="2000-01-01") == cmcdict.get_typvar_metadata("K")
+    with pytest.raises(ValueError):
+        cmcdict.get_metvar_metadata("TT", as_of="20-01-2020")
+    with pytest.raises(TypeError):
+        cmcdict.get_metvar_metadata("TT", as_of=20200101)
+    with pytest.raises(ValueError):
+        cmcdict.get_typvar_metadata("K", as_of="invalid")
+
+
+def test_73(tmp_path, monkeypatch):
+    """test point in time lookups of variables defined per IP value keep the most recent definition"""
+    dict_file = tmp_path / "opdict" / "ops.variable_dictionary.xml"
+    dict_file.parent.mkdir()
+    content = open(os.path.join(os.path.dirname(TEST_DIR), "cmcdict", "dict.xml"), encoding="utf-8").read()
+    redated = (
+        '<metvar usage="current" origin="TEB" date="2024-01-01">\n'
+        '      <nomvar ip1="1196">DXSU</nomvar>\n'
+        "      <measure><real><units>K</units></real></measure>\n"
+        "</metvar>\n"
+    )
+    dict_file.write_text(content.replace("<metvar ", redated + "<metvar ", 1), encoding="utf-8")
+    monkeypatch.setenv("CMCCONST", str(tmp_path))
+    monkeypatch.setattr(cmcdict.CMCDictionary, "_instance", None)
+    cmcdict.cache_clear()
+    try:
+        assert cmcdict.get_metvar_metadata("DXSU", columns=["units"])["1196"]["units"] == "K"
+        assert cmcdict.get_metvar_metadata("DXSU", columns=["units"], as_of="2020-01-01")["1196"]["units"] == "°C"
+        assert cmcdict.get_metvar_metadata("DXSU", columns=["units"], as_of="2018-01-01") is None
+    finally:
+        cmcdict.cache_clear()
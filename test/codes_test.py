@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+import cmcdict
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+def test_01():
+    """Test code tables are sorted by value with meanings in both languages"""
+    table = cmcdict.get_code_table("CM2")
+    assert table.values.tolist() == [0, 1, 255]
+    assert table.meanings_en.tolist() == ["Clear", "Cloudy", "Fill value"]
+    assert table.meanings_fr.tolist() == ["Clair", "Nuageux", "Valeur de remplissage"]
+    assert cmcdict.get_code_table("CM2") is table
+    with pytest.raises(ValueError):
+        table.values[0] = 7
+    assert not table.meanings_en.flags.writeable
+    assert not table.meanings_fr.flags.writeable
+
+
+def test_02():
+    """Test meanings without language and values that are not integers"""
+    table = cmcdict.get_code_table("CVNQ")
+    assert table.meanings_en.tolist() == ["Clear sky", "FEW", "SCT", "BKN", "OVC"]
+    assert table.meanings_fr.tolist() == ["Ciel clair", "FEW", "SCT", "BKN", "OVC"]
+
+    # ">0" cannot be looked up and is only in the codes string
+    table = cmcdict.get_code_table("H_SN")
+    assert table.values.tolist() == [-2, -1]
+    assert cmcdict.get_metvar_metadata("H_SN", columns=["codes"])["codes"].startswith(">0:")
+
+
+def test_03():
+    """Test 2-D fields are decoded to meanings, unknown values are empty"""
+    result = cmcdict.decode_codes("CM2", np.array([[0, 1], [255, 7]], dtype=np.uint8))
+    assert result.tolist() == [["Clear", "Cloudy"], ["Fill value", ""]]
+    result = cmcdict.decode_codes("CM2", np.array([0, 1]), lang="fr")
+    assert result.tolist() == ["Clair", "Nuageux"]
+
+
+def test_04():
+    """Test indices of real fields, non integer and NaN values are not in the table"""
+    result = cmcdict.decode_codes("CM2", np.array([0.0, 1.5, np.nan, 255.0, -3.0], dtype=np.float32), indices=True)
+    assert result.tolist() == [0, -1, -1, 2, -1]
+
+
+def test_05():
+    """Test variables without codes and invalid arguments"""
+    assert cmcdict.decode_codes("TT", np.zeros(2)) is None
+    assert cmcdict.decode_codes("INVALID", np.zeros(2)) is None
+    with pytest.raises(ValueError):
+        cmcdict.decode_codes("CM2", np.zeros(2), lang="de")
+    with pytest.raises(TypeError):
+        cmcdict.decode_codes("CM2", np.array(["a"]))
+    with pytest.raises(TypeError):
+        cmcdict.get_code_table(None)
+
+
+def test_06():
+    """Test tables are cached per definition, not per IP value of the queries"""
+    table = cmcdict.get_code_table("CM2")
+    for ip1 in range(0, 1000, 10):
+        assert cmcdict.get_code_table("CM2", ip1=ip1) is table
+    dictionary = cmcdict._get_dictionary()
+    assert sum(cached is table for cached in dictionary._code_tables.values()) == 1
@@ -2,8 +2,11 @@
 
 import re
 import os
+import shutil
 import sys
 
+import pytest
+
 # Add the parent directory to Python path to ensure cmcdict can be imported
 root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if root_dir not in sys.path:
@@ -26,3 +29,13 @@ def pytest_itemcollected(item):
     doc = re.sub("[ôö]", "o", doc)
     doc = re.sub("[ùû]", "u", doc)
     item._nodeid = " : ".join([item._nodeid, doc])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def snapshot_cache(tmp_path_factory):
+    """Keep dictionary snapshots written during the tests out of the user's cache"""
+    path = tmp_path_factory.mktemp("cmcdict-cache")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("CMCDICT_CACHE_DIR", str(path))
+        yield path
+    shutil.rmtree(path, ignore_errors=True)
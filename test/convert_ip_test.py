@@ -1,5 +1,6 @@
+import numpy as np
 import pytest
-from cmcdict import convert_ip, Kind
+from cmcdict import convert_ip, convert_ip_array, Kind
 
 pytestmark = [pytest.mark.unit_tests]
 
@@ -207,3 +208,59 @@ def test_15():
     ip, p, kind = convert_ip(1300, 0, 0, -1)
     assert kind == Kind.PRESSURE
     assert p < 1.0  # Value in complex pressure range
+
+
+def test_16():
+    """Test vectorized decoding is identical to scalar decoding"""
+    rng = np.random.default_rng(0)
+    ips = np.concatenate([np.arange(-10, 32768), rng.integers(32768, 1 << 28, 100000)])
+    rip, rp, rkind = convert_ip_array(ips, 0, 0, -1)
+    assert rip.tolist() == ips.tolist()
+    expected = [convert_ip(int(ip), 0, 0, -1) for ip in ips]
+    assert rp.tobytes() == np.array([p for _, p, _ in expected], dtype=np.float64).tobytes()
+    assert rkind.tolist() == [int(kind) for _, _, kind in expected]
+
+
+def test_17():
+    """Test vectorized encoding is identical to scalar encoding"""
+    rng = np.random.default_rng(0)
+    kinds = [int(kind) for kind in Kind] + [7, -1]
+    values = np.concatenate(
+        [
+            rng.uniform(-200.0, 1200.0, 20000),
+            rng.uniform(-1.0, 1.0, 20000) * 10.0 ** rng.uniform(-8, 8, 20000),
+            np.array([0.0, 0.5, 1.0, 2.5, 1100.0, 1100.1, -100.0, 1e-5, -1e-5, 1e11]),
+        ]
+    )
+    for kind in kinds:
+        rip, rp, rkind = convert_ip_array(0, values, kind, 1)
+        expected = [convert_ip(0, float(p), kind, 1) for p in values]
+        assert rip.tolist() == [ip for ip, _, _ in expected]
+        assert rkind.tolist() == [int(kind) for _, _, kind in expected]
+        assert rp.tobytes() == values.tobytes()
+
+
+def test_18():
+    """Test vectorized conversion broadcasts and round trips"""
+    levels = np.array([[1000.0, 850.0], [500.0, 10.0]])
+    ip, p, kind = convert_ip_array(0, levels, Kind.PRESSURE, 1)
+    assert ip.shape == levels.shape
+    assert (kind == Kind.PRESSURE).all()
+    _, rev_p, rev_kind = convert_ip_array(ip, 0, 0, -1)
+    assert np.allclose(rev_p, levels)
+    assert (rev_kind == Kind.PRESSURE).all()
+
+
+def test_19():
+    """Test old style decoding table matches the range rules for every old style IP"""
+    from cmcdict.ip import OLD_STYLE_TABLE_SIZE, _decode_old_style_value, _old_style_table
+
+    values, kinds = _old_style_table()
+    assert len(values) == len(kinds) == OLD_STYLE_TABLE_SIZE
+    for ip in range(OLD_STYLE_TABLE_SIZE):
+        p, kind = _decode_old_style_value(ip)
+        assert values[ip] == p
+        assert kinds[ip] == kind
+        assert convert_ip(ip, 0, 0, -1) == (ip, p, kind)
+    assert isinstance(convert_ip(850, 0, 0, -1)[2], Kind)
+    assert convert_ip(-5, 0, 0, -1) == (-5, -5.0, Kind.ARBITRARY)
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import polars as pl
+import pytest
+
+import cmcdict
+import cmcdict.expressions  # noqa: F401
+from cmcdict import Kind, convert_ip
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+def test_01():
+    """Test decoding IP columns of integers matches convert_ip"""
+    ips = [0, 12000, 41394464, 95178882, 1195, 32767]
+    df = pl.DataFrame({"ip1": ips}).with_columns(
+        level=pl.col("ip1").cmcdict.decode_ip(), kind=pl.col("ip1").cmcdict.level_kind()
+    )
+    assert df.schema["level"] == pl.Float64
+    assert df.schema["kind"] == pl.Int8
+    assert df["level"].to_list() == [convert_ip(ip, 0, 0, -1)[1] for ip in ips]
+    assert df["kind"].to_list() == [int(convert_ip(ip, 0, 0, -1)[2]) for ip in ips]
+
+
+def test_02():
+    """Test IP columns of strings, missing values are null"""
+    df = pl.DataFrame({"ip1": ["12000", " 41394464", "", None, "abc"]})
+    result = df.select(pl.col("ip1").cmcdict.decode_ip(), kind=pl.col("ip1").cmcdict.level_kind())
+    assert result["ip1"].to_list() == [1.0, 500.0, None, None, None]
+    assert result["kind"].to_list() == [Kind.SIGMA, Kind.PRESSURE, None, None, None]
+
+
+def test_03():
+    """Test encoding levels with a constant kind or a kind column"""
+    df = pl.DataFrame({"level": [850.0, 1.0, None, np.nan], "kind": [Kind.PRESSURE, Kind.SIGMA, Kind.PRESSURE, 2]})
+    result = df.select(
+        pressure=pl.col("level").cmcdict.encode_ip(Kind.PRESSURE), mixed=pl.col("level").cmcdict.encode_ip("kind")
+    )
+    assert result.schema["pressure"] == pl.Int64
+    expected = convert_ip(0, 850.0, Kind.PRESSURE, 1)[0]
+    assert result["pressure"].to_list() == [expected, convert_ip(0, 1.0, Kind.PRESSURE, 1)[0], None, None]
+    assert result["mixed"].to_list() == [expected, convert_ip(0, 1.0, Kind.SIGMA, 1)[0], None, None]
+
+
+def test_04():
+    """Test round trips over lazy frames and the IP columns of the dictionary"""
+    levels = np.linspace(1.0, 1000.0, 1000)
+    result = (
+        pl.LazyFrame({"level": levels})
+        .with_columns(ip=pl.col("level").cmcdict.encode_ip(Kind.PRESSURE))
+        .with_columns(decoded=pl.col("ip").cmcdict.decode_ip())
+        .collect()
+    )
+    assert np.allclose(result["decoded"].to_numpy(), levels, rtol=1e-5)
+
+    metvars = cmcdict._get_dictionary()._metvar_df.select(pl.col("ip1").cmcdict.decode_ip().alias("level"), "ip1_p")
+    assert metvars["level"].to_list() == metvars["ip1_p"].to_list()
+
+
+@pytest.mark.parametrize("first", ["cmcdict", "polars"])
+def test_05(first):
+    """Test the namespace is only registered by importing cmcdict.expressions, in any import order"""
+    code = (
+        f"import {first}\n"
+        "import cmcdict\n"
+        "import polars as pl\n"
+        "cmcdict.get_metvar_metadata('TT')\n"
+        "assert not hasattr(pl.col('ip1'), 'cmcdict')\n"
+        "import cmcdict.expressions\n"
+        "assert pl.DataFrame({'ip1': [12000]}).select(pl.col('ip1').cmcdict.decode_ip()).item() == 1.0\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__)), capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
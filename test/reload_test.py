@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import time
+
+import pytest
+
+import cmcdict
+from cmcdict.snapshot import SHARED_DICTIONARY_ENV
+
+pytestmark = [pytest.mark.unit_tests]
+
+# Get the test directory path
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+DICT_FILE = os.path.join(os.path.dirname(TEST_DIR), "cmcdict", "dict.xml")
+
+
+@pytest.fixture
+def dict_file(tmp_path, monkeypatch):
+    """Load the dictionary from a copy of the package dictionary that tests can modify"""
+    path = tmp_path / "opdict" / "ops.variable_dictionary.xml"
+    path.parent.mkdir()
+    shutil.copyfile(DICT_FILE, path)
+    monkeypatch.setenv("CMCCONST", str(tmp_path))
+    monkeypatch.setenv("CMCDICT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(cmcdict.CMCDictionary, "_instance", None)
+    cmcdict.preload()
+    yield path
+    cmcdict.disable_auto_reload()
+
+
+def _rename_units(path, old, new):
+    """Modify the dictionary file, changing its size and modification time"""
+    content = path.read_text(encoding="utf-8").replace(old, new)
+    path.write_text(content, encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_01(dict_file):
+    """reload does nothing when the dictionary file did not change"""
+    assert cmcdict.generation() == 0
+    assert not cmcdict.reload()
+    assert cmcdict.generation() == 0
+
+
+def test_02(dict_file):
+    """reload swaps in the modified dictionary and notifies callbacks"""
+    generations = []
+    cmcdict.add_reload_callback(generations.append)
+    try:
+        previous = cmcdict._get_dictionary()
+        assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "°C"}
+
+        _rename_units(dict_file, "<units>°C</units>", "<units>degC</units>")
+        assert cmcdict.reload()
+    finally:
+        cmcdict.remove_reload_callback(generations.append)
+
+    assert generations == [1]
+    assert cmcdict.generation() == 1
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "degC"}
+    # Holders of the previous dictionary keep a consistent view
+    assert previous.get_metvar("TT", ["units"]) == {"nomvar": "TT", "units": "°C"}
+
+
+def test_03(dict_file):
+    """forced reload builds a new generation of an unchanged dictionary"""
+    assert cmcdict.reload(force=True)
+    assert cmcdict.generation() == 1
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "°C"}
+
+
+def test_04(dict_file):
+    """auto reload picks up a modified dictionary in the background"""
+    cmcdict.enable_auto_reload(interval=0.05)
+    _rename_units(dict_file, "<units>°C</units>", "<units>degC</units>")
+
+    deadline = time.monotonic() + 10
+    while cmcdict.generation() == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert cmcdict.generation() == 1
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "degC"}
+
+
+def test_05(dict_file):
+    """auto reload keeps the current dictionary when the new file is invalid"""
+    dictionary = cmcdict._get_dictionary()
+    cmcdict.enable_auto_reload(interval=0.05)
+    dict_file.write_text("<metvars><metvar", encoding="utf-8")
+    time.sleep(0.3)
+
+    assert cmcdict._get_dictionary() is dictionary
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "°C"}
+
+
+def test_06():
+    """auto reload interval must be positive"""
+    with pytest.raises(ValueError):
+        cmcdict.enable_auto_reload(interval=0)
+
+
+def test_07(dict_file):
+    """reload invalidates the cached metadata results"""
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "°C"}
+    _rename_units(dict_file, "<units>°C</units>", "<units>degC</units>")
+    assert cmcdict.reload()
+    assert cmcdict.cache_info().currsize == 0
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "degC"}
+
+
+def test_08(dict_file, tmp_path, monkeypatch):
+    """reload of a shared dictionary compares the file the parent loaded, then reads the file"""
+    monkeypatch.setenv(SHARED_DICTIONARY_ENV, "")
+    cmcdict.export_shared(tmp_path / "shared")
+    monkeypatch.setattr(cmcdict.CMCDictionary, "_instance", None)
+    with monkeypatch.context() as patch:
+        patch.setattr(cmcdict.dictionary, "_parse_opt_dict", None)
+        patch.setattr(cmcdict.dictionary, "load_snapshot", None)
+        cmcdict.preload()
+
+    assert [cmcdict.reload() for _ in range(3)] == [False, False, False]
+    assert cmcdict.generation() == 0
+
+    _rename_units(dict_file, "<units>°C</units>", "<units>degC</units>")
+    assert cmcdict.reload()
+    assert cmcdict.generation() == 1
+    assert cmcdict.get_metvar_metadata("TT", columns=["units"]) == {"nomvar": "TT", "units": "degC"}
@@ -0,0 +1,71 @@
+import pytest
+
+import cmcdict
+from cmcdict.search import fold, tokenize
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+def test_01():
+    """Test terms are lowercased and accents removed"""
+    assert fold("Précipitation Élevée") == "precipitation elevee"
+    assert tokenize("Indique si le ciel est clair, l’étiquette") == [
+        "indique",
+        "si",
+        "le",
+        "ciel",
+        "est",
+        "clair",
+        "l",
+        "etiquette",
+    ]
+
+
+def test_02():
+    """Test all the query words must match in either language"""
+    results = cmcdict.search("cloud mask")
+    assert [result.nomvar for result in results] == ["CM2", "CCM", "CM4"]
+    assert results[0].score >= results[-1].score
+    assert [result.nomvar for result in cmcdict.search("masque nuages", lang="fr")][:2] == ["CM2", "CM4"]
+
+
+def test_03():
+    """Test accents are ignored and the last word matches as a prefix"""
+    with_accent = cmcdict.search("précipitation", lang="fr", limit=None)
+    without_accent = cmcdict.search("precipitation", lang="fr", limit=None)
+    assert with_accent == without_accent
+    assert with_accent
+    assert {result.nomvar for result in cmcdict.search("air temp", lang="en", limit=None)} >= {"TT", "TS"}
+    assert cmcdict.search("humidity", lang="fr") == []
+
+
+def test_04():
+    """Test nomvar matches rank first and descriptions follow the language"""
+    results = cmcdict.search("tt")
+    assert results[0].nomvar == "TT"
+    assert results[0].description == "Air temperature"
+    assert cmcdict.search("TT", lang="fr")[0].description == "Température de l'air"
+
+
+def test_05():
+    """Test limits, empty queries and invalid arguments"""
+    assert len(cmcdict.search("temperature", limit=3)) == 3
+    assert len(cmcdict.search("temperature", limit=None)) > 10
+    assert cmcdict.search("") == []
+    assert cmcdict.search("zzzzzz") == []
+    with pytest.raises(TypeError):
+        cmcdict.search(None)
+    with pytest.raises(ValueError):
+        cmcdict.search("tt", lang="de")
+    with pytest.raises(ValueError):
+        cmcdict.search("tt", limit=0)
+    with pytest.raises(ValueError):
+        cmcdict.search("tt", usages=["invalid"])
+
+
+def test_06():
+    """Test ties rank the shortest descriptions and nomvars first"""
+    results = cmcdict.search("temperature", lang="en", limit=None)
+    assert results[0].nomvar == "TT"
+    tied = [result for result in results if result.score == results[0].score]
+    assert [len(result.description) for result in tied] == sorted(len(result.description) for result in tied)
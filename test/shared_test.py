@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import cmcdict
+import cmcdict.dictionary
+from cmcdict.snapshot import SHARED_DICTIONARY_ENV
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+def _forbid_parsing():
+    """Make the worker fail if the operational dictionary is parsed or its snapshot loaded"""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("worker did not use the shared dictionary")
+
+    cmcdict.dictionary._parse_opt_dict = fail
+    cmcdict.dictionary.load_snapshot = fail
+
+
+def _lookup_without_parsing(nomvar):
+    _forbid_parsing()
+    return cmcdict.get_metvar_metadata(nomvar, columns=["units"])
+
+
+def _attach_without_parsing(path):
+    _forbid_parsing()
+    cmcdict.attach_shared(path)
+
+
+@pytest.fixture
+def shared_env(monkeypatch):
+    """Restore the shared dictionary environment variable after the test"""
+    monkeypatch.setenv(SHARED_DICTIONARY_ENV, "")
+
+
+def test_01(shared_env, tmp_path):
+    """spawned workers attach to the exported dictionary instead of parsing it"""
+    path = cmcdict.export_shared(tmp_path)
+    assert os.environ[SHARED_DICTIONARY_ENV] == str(path)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+        results = list(executor.map(_lookup_without_parsing, ["TT", "UU", "INVALID"]))
+
+    assert results == [{"nomvar": "TT", "units": "°C"}, {"nomvar": "UU", "units": "kts"}, None]
+
+
+def test_02(shared_env, tmp_path, monkeypatch):
+    """workers can attach explicitly from a pool initializer"""
+    path = cmcdict.export_shared(tmp_path)
+    monkeypatch.setenv(SHARED_DICTIONARY_ENV, "")
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=context, initializer=_attach_without_parsing, initargs=(str(path),)
+    ) as executor:
+        assert list(executor.map(_lookup_without_parsing, ["TT"])) == [{"nomvar": "TT", "units": "°C"}]
+
+
+def test_03(shared_env):
+    """default export directory is temporary"""
+    path = cmcdict.export_shared()
+    assert path.is_dir()
+    assert sorted(p.name for p in path.iterdir()) == [
+        "shared.metvar.arrow",
+        "shared.source.json",
+        "shared.typvar.arrow",
+    ]
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+
+import pytest
+
+import cmcdict
+from cmcdict.snapshot import load_snapshot, save_snapshot, snapshot_key
+
+pytestmark = [pytest.mark.unit_tests]
+
+# Get the test directory path
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+DICT_FILE = os.path.join(os.path.dirname(TEST_DIR), "cmcdict", "dict.xml")
+
+
+@pytest.fixture
+def dict_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("CMCDICT_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "dict.xml"
+    shutil.copyfile(DICT_FILE, path)
+    return path
+
+
+def test_01(dict_file):
+    """snapshot round trip returns the same DataFrames"""
+    dictionary = cmcdict._get_dictionary()
+    assert load_snapshot(dict_file) is None
+    assert save_snapshot(dict_file, dictionary._metvar_df, dictionary._typvar_df) is not None
+
+    metvar_df, typvar_df = load_snapshot(dict_file)
+    assert metvar_df.equals(dictionary._metvar_df)
+    assert typvar_df.equals(dictionary._typvar_df)
+
+
+def test_02(dict_file):
+    """snapshot key changes when the dictionary file is modified"""
+    key = snapshot_key(dict_file)
+    stat = dict_file.stat()
+    os.utime(dict_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert snapshot_key(dict_file) != key
+
+    key = snapshot_key(dict_file)
+    with open(dict_file, "a") as f:
+        f.write("\n")
+    assert snapshot_key(dict_file) != key
+
+
+def test_03(dict_file):
+    """saving a new snapshot removes the previous snapshot of the same file"""
+    dictionary = cmcdict._get_dictionary()
+    old_path = save_snapshot(dict_file, dictionary._metvar_df, dictionary._typvar_df)
+    with open(dict_file, "a") as f:
+        f.write("\n")
+    new_path = save_snapshot(dict_file, dictionary._metvar_df, dictionary._typvar_df)
+    assert new_path != old_path
+    assert not old_path.exists()
+    assert sorted(p.name for p in new_path.parent.iterdir()) == sorted(
+        [new_path.name, new_path.name.replace(".metvar.", ".typvar.")]
+    )
+
+
+def test_04(dict_file, monkeypatch):
+    """snapshots can be disabled"""
+    monkeypatch.setenv("CMCDICT_DISABLE_SNAPSHOT", "1")
+    dictionary = cmcdict._get_dictionary()
+    assert save_snapshot(dict_file, dictionary._metvar_df, dictionary._typvar_df) is None
+    assert load_snapshot(dict_file) is None
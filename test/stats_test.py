@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+import cmcdict
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+@pytest.fixture
+def enabled():
+    """Record lookup statistics during the test"""
+    cmcdict.reset_stats()
+    cmcdict.enable_stats()
+    yield
+    cmcdict.disable_stats()
+    cmcdict.reset_stats()
+
+
+def test_01():
+    """lookup statistics are not recorded by default"""
+    cmcdict.reset_stats()
+    _ = cmcdict.get_metvar_metadata("TT")
+    _ = cmcdict.convert_ip(1196, 0, 0, -1)
+    stats = cmcdict.stats()
+    assert not stats["enabled"]
+    assert stats["apis"] == {}
+    # The disabled path is the original function
+    assert cmcdict.convert_ip is cmcdict.ip._convert_ip
+
+
+def test_02(enabled):
+    """lookups are counted per function with hits and misses"""
+    _ = cmcdict.get_metvar_metadata("TT")
+    _ = cmcdict.get_metvar_metadata("INVALID")
+    _ = cmcdict.get_typvar_metadata("P")
+    _ = cmcdict.convert_ip(1196, 0, 0, -1)
+
+    apis = cmcdict.stats()["apis"]
+    assert (apis["get_metvar_metadata"]["calls"], apis["get_metvar_metadata"]["hits"]) == (2, 1)
+    assert apis["get_metvar_metadata"]["misses"] == 1
+    assert (apis["get_typvar_metadata"]["calls"], apis["get_typvar_metadata"]["hits"]) == (1, 1)
+    assert apis["convert_ip"]["calls"] == 1
+    assert cmcdict.convert_ip.__name__ == "convert_ip"
+    for api in apis.values():
+        assert sum(api["histogram"].values()) == api["calls"]
+        assert api["total_time"] > 0
+
+
+def test_03(enabled):
+    """lookups raising an exception are counted as errors"""
+    with pytest.raises(ValueError):
+        _ = cmcdict.get_metvar_metadata("TT", columns=["invalid"])
+    api = cmcdict.stats()["apis"]["get_metvar_metadata"]
+    assert (api["calls"], api["errors"], api["hits"], api["misses"]) == (1, 1, 0, 0)
+
+
+def test_04(monkeypatch):
+    """the phases of a dictionary load are timed"""
+    monkeypatch.setenv("CMCDICT_DISABLE_SNAPSHOT", "1")
+    monkeypatch.setattr(cmcdict.CMCDictionary, "_instance", None)
+    cmcdict.preload()
+
+    load = cmcdict.stats()["load"]
+    for phase in ["discover", "parse", "process", "frame_build", "index", "total"]:
+        assert load[phase] > 0
+    assert load["total"] >= load["parse"] + load["process"] + load["frame_build"]
+
+
+def test_05():
+    """memory estimates are reported for the loaded frames"""
+    cmcdict.preload()
+    memory = cmcdict.stats()["memory"]
+    assert memory["metvar_df"] > memory["typvar_df"] > 0
+    assert memory["metvar_rows"] > 0
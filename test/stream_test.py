@@ -0,0 +1,78 @@
+import itertools
+
+import polars as pl
+import pytest
+
+import cmcdict
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+def test_01():
+    """Test records are annotated in input order across chunks"""
+    records = [("TT", "P", 12000, 0, 0), ("UDST", "P", 1196, "", ""), ("UDST", "A", None, None, None), ("XX",)]
+    result = list(cmcdict.annotate_stream(records, columns=["units"], chunk_size=3))
+    assert [record["nomvar"] for record in result] == ["TT", "UDST", "UDST", "XX"]
+    assert [record["units"] for record in result] == ["°C", "m/s", None, None]
+    assert result[0] == {"nomvar": "TT", "typvar": "P", "ip1": 12000, "ip2": 0, "ip3": 0, "units": "°C"}
+    assert result[3]["ip1"] is None
+
+
+def test_02():
+    """Test results match the batch lookup, with mappings and typvar columns"""
+    records = [{"nomvar": "TT", "typvar": "P"}, {"nomvar": "UU", "typvar": "K"}, {"nomvar": "VV", "typvar": "ZZ"}]
+    result = list(cmcdict.annotate_stream(records, typvar_columns=["description_short_en"]))
+    expected = cmcdict.get_metvar_metadata_frame(["TT", "UU", "VV"]).drop("nomvar").to_dicts()
+    for record, metadata in zip(result, expected):
+        assert {key: record[key] for key in metadata} == metadata
+    assert [record["typvar_description_short_en"] for record in result] == [
+        cmcdict.get_typvar_metadata("P")["description_short_en"],
+        cmcdict.get_typvar_metadata("K")["description_short_en"],
+        None,
+    ]
+
+
+def test_03():
+    """Test chunks are yielded as DataFrames"""
+    records = (("TT", "P", 0, 0, 0) for _ in range(25))
+    frames = list(cmcdict.annotate_stream(records, columns=["units"], chunk_size=10, output="frames"))
+    assert [frame.height for frame in frames] == [10, 10, 5]
+    assert frames[0].columns == ["nomvar", "typvar", "ip1", "ip2", "ip3", "units"]
+    assert frames[0].schema["ip1"] == pl.Utf8
+    assert frames[2]["units"].to_list() == ["°C"] * 5
+
+
+def test_04():
+    """Test infinite streams are pulled one chunk at a time"""
+    pulled = []
+
+    def records():
+        for index in itertools.count():
+            pulled.append(index)
+            yield ("TT", "P", 0, 0, 0)
+
+    stream = cmcdict.annotate_stream(records(), columns=["units"], chunk_size=100)
+    assert len(list(itertools.islice(stream, 150))) == 150
+    assert len(pulled) == 200
+
+
+def test_05():
+    """Test chunks are yielded as Arrow record batches"""
+    pytest.importorskip("pyarrow")
+    batches = list(cmcdict.annotate_stream([("TT", "P", 0, 0, 0)] * 3, columns=["units"], output="arrow"))
+    assert sum(batch.num_rows for batch in batches) == 3
+    assert batches[0].schema.names[-1] == "units"
+
+
+def test_06():
+    """Test invalid arguments are rejected before pulling records"""
+    with pytest.raises(ValueError):
+        cmcdict.annotate_stream([], columns=["invalid"])
+    with pytest.raises(ValueError):
+        cmcdict.annotate_stream([], chunk_size=0)
+    with pytest.raises(ValueError):
+        cmcdict.annotate_stream([], output="pandas")
+    with pytest.raises(ValueError):
+        cmcdict.annotate_stream([], typvar_columns=["invalid"])
+    with pytest.raises(TypeError):
+        list(cmcdict.annotate_stream(["TT"]))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import cmcdict
+
+pytestmark = [pytest.mark.unit_tests]
+
+THREADS = 32
+LOOKUPS = 200
+
+
+@pytest.fixture
+def unloaded(monkeypatch):
+    """Reset the singleton and count dictionary loads"""
+    loads = []
+    load_dictionary = cmcdict.CMCDictionary._load_dictionary
+
+    def counting_load(self):
+        loads.append(threading.get_ident())
+        # Widen the window during which other threads can race the load
+        time.sleep(0.05)
+        load_dictionary(self)
+
+    monkeypatch.setattr(cmcdict.CMCDictionary, "_instance", None)
+    monkeypatch.setattr(cmcdict.CMCDictionary, "_load_dictionary", counting_load)
+    return loads
+
+
+def test_01(unloaded):
+    """concurrent first lookups load the dictionary exactly once"""
+    barrier = threading.Barrier(THREADS)
+
+    def lookup(_):
+        barrier.wait()
+        return cmcdict.get_metvar_metadata("TT", columns=["units"])
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(lookup, range(THREADS)))
+
+    assert len(unloaded) == 1
+    assert all(result == {"nomvar": "TT", "units": "°C"} for result in results)
+
+
+def test_02(unloaded):
+    """many threads hammering lookups get consistent results"""
+    nomvars = ["TT", "UU", "VV", "UDST", "QO1", "INVALID"]
+    expected = cmcdict.get_metvar_metadata(nomvars, columns=["units", "description_short_en"])
+    expected_ip = cmcdict.get_metvar_metadata("UDST", ip1=1196, columns=["description_short_en"])
+    expected_typvar = cmcdict.get_typvar_metadata("R")
+
+    def hammer(i):
+        for _ in range(LOOKUPS):
+            assert cmcdict.get_metvar_metadata(nomvars, columns=["units", "description_short_en"]) == expected
+            assert cmcdict.get_metvar_metadata("UDST", ip1=1196, columns=["description_short_en"]) == expected_ip
+            assert cmcdict.get_typvar_metadata("R") == expected_typvar
+        return i
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        assert sorted(executor.map(hammer, range(THREADS))) == list(range(THREADS))
+
+    assert len(unloaded) == 1
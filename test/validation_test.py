@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import cmcdict
+
+pytestmark = [pytest.mark.unit_tests]
+
+
+def test_01():
+    """Test out of range values are counted against the dictionary bounds"""
+    check = cmcdict.validate_ranges("ALRD", np.array([0.2, 1.5, -0.1, 1.0, 0.0, np.nan]))
+    assert check.min == 0.0
+    assert check.max == 1.0
+    assert check.size == 6
+    assert check.below == 1
+    assert check.above == 1
+    assert check.out_of_range == 2
+    assert check.mask is None
+
+
+def test_02():
+    """Test the mask has the shape of the input and the input is not modified"""
+    values = np.array([[0.2, 1.5], [-0.1, 1.0]], dtype=np.float32)
+    original = values.copy()
+    check = cmcdict.validate_ranges("ALRD", values, mask=True)
+    assert check.mask.shape == (2, 2)
+    assert check.mask.tolist() == [[False, True], [True, False]]
+    assert np.array_equal(values, original)
+
+
+def test_03():
+    """Test integer arrays, non contiguous views and single bounds"""
+    check = cmcdict.validate_ranges("ABE", np.arange(-5, 20000, 5)[::2])
+    assert check.below == 1
+    assert check.above == np.count_nonzero(np.arange(-5, 20000, 5)[::2] > 10000)
+
+    check = cmcdict.validate_ranges("AH10", np.array([-1.0, 1e30]), mask=True)
+    assert check.max is None
+    assert (check.below, check.above) == (1, 0)
+    assert check.mask.tolist() == [True, False]
+
+
+def test_04():
+    """Test variables without bounds and unknown variables"""
+    check = cmcdict.validate_ranges("TT", np.array([-300.0, 300.0]), mask=True)
+    assert (check.min, check.max, check.out_of_range) == (None, None, 0)
+    assert not check.mask.any()
+    assert cmcdict.validate_ranges("INVALID", np.zeros(3)) is None
+
+
+def test_05():
+    """Test variables defined per IP value share or require their bounds"""
+    check = cmcdict.validate_ranges("AL", np.array([2.0]))
+    assert (check.min, check.max, check.above) == (0.0, 1.0, 1)
+    check = cmcdict.validate_ranges("AL", np.array([2.0]), ip1=1199)
+    assert check.above == 1
+
+
+def test_06():
+    """Test the batch form over mappings and pairs"""
+    fields = {"ALRD": np.array([2.0, 0.5]), "TT": np.zeros(4), "INVALID": np.zeros(1)}
+    results = cmcdict.validate_ranges_batch(fields)
+    assert [result.out_of_range if result else None for result in results] == [1, 0, None]
+
+    results = cmcdict.validate_ranges_batch([("ALRD", np.array([2.0])), ("ALRD", np.array([-1.0, 0.0]))], mask=True)
+    assert [result.mask.tolist() for result in results] == [[True], [True, False]]
+
+
+def test_07():
+    """Test invalid arguments"""
+    with pytest.raises(TypeError):
+        cmcdict.validate_ranges("ALRD", np.array(["a", "b"]))
+    with pytest.raises(TypeError):
+        cmcdict.validate_ranges(1, np.zeros(1))
+    with pytest.raises(ValueError):
+        cmcdict.validate_ranges("ALRD", np.zeros(1), usages=["invalid"])